@@ -22,11 +22,17 @@ Usage Examples:
 
     # Skip files that already have commented versions
     python batch_process.py --language vfp --path "VFP_Files_Copy" --skip-existing
+
+    # Process 4 files concurrently
+    python batch_process.py --language vfp --path "VFP_Files_Copy" --workers 4
 """
 
 import sys
 import time
+import hashlib
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional, Tuple, List, Dict
 import click
@@ -85,7 +91,8 @@ def process_single_file(
     client: InstructorLLMClient,
     processor: TwoPhaseProcessor,
     handler,
-    root_directory: Optional[Path] = None
+    root_directory: Optional[Path] = None,
+    record_source_hash: bool = False
 ) -> Tuple[bool, FileProcessingResult]:
     """
     Process a single code file.
@@ -97,22 +104,27 @@ def process_single_file(
         processor: Two-phase processor
         handler: Language handler
         root_directory: Root directory for relative path calculation
+        record_source_hash: Record the source hash in the result so a resumed
+                            session can detect files changed since
 
     Returns:
         Tuple of (success, FileProcessingResult)
     """
-    start_time = time.time()
+    start_time = time.perf_counter()
 
     try:
         logger.info(f"Processing file: {file_path}")
 
         # Determine encoding based on language
-        encoding = 'latin1' if handler.get_language_name() == 'vfp' else 'utf-8'
+        encoding = get_source_encoding(handler)
 
         # Read the file
         with open(file_path, 'r', encoding=encoding, errors='ignore') as f:
             code = f.read()
 
+        # Hash the source as read, before any time is spent commenting it
+        source_hash = get_source_hash(code) if record_source_hash else None
+
         # Calculate relative path
         if root_directory:
             try:
@@ -130,7 +142,7 @@ def process_single_file(
         )
 
         if not result.success:
-            processing_time = time.time() - start_time
+            processing_time = time.perf_counter() - start_time
             return False, FileProcessingResult(
                 file_path=str(file_path),
                 status='failed',
@@ -148,7 +160,7 @@ def process_single_file(
         with open(output_path, 'w', encoding=encoding, errors='ignore') as f:
             f.write(result.commented_code)
 
-        processing_time = time.time() - start_time
+        processing_time = time.perf_counter() - start_time
 
         logger.info(f"Successfully processed: {file_path} -> {output_path}")
         logger.info(f"Processing time: {processing_time:.2f}s")
@@ -162,11 +174,12 @@ def process_single_file(
             commented_size=len(result.commented_code),
             validation_passed=True,
             processing_method="two_phase",
-            comments_added=len(result.commented_code.split('\n')) - len(code.split('\n'))
+            comments_added=result.commented_code.count('\n') - code.count('\n'),
+            source_hash=source_hash
         )
 
     except Exception as e:
-        processing_time = time.time() - start_time
+        processing_time = time.perf_counter() - start_time
         logger.error(f"Error processing {file_path}: {e}", exc_info=True)
 
         return False, FileProcessingResult(
@@ -180,6 +193,32 @@ def process_single_file(
         )
 
 
+def get_source_encoding(handler) -> str:
+    """
+    Get the encoding source files are read and written with.
+
+    Args:
+        handler: Language handler
+
+    Returns:
+        Encoding name (latin1 for VFP, utf-8 otherwise)
+    """
+    return 'latin1' if handler.get_language_name() == 'vfp' else 'utf-8'
+
+
+def get_source_hash(code: str) -> str:
+    """
+    Hash source code as read for processing.
+
+    Args:
+        code: Source file contents
+
+    Returns:
+        SHA-256 hex digest of the code
+    """
+    return hashlib.sha256(code.encode('utf-8')).hexdigest()
+
+
 def should_skip_existing(file_info: Dict[str, str]) -> bool:
     """
     Check if the output file already exists.
@@ -206,7 +245,8 @@ def process_batch(
     handler,
     skip_existing: bool = False,
     dry_run: bool = False,
-    resume: bool = False
+    resume: bool = False,
+    workers: Optional[int] = None
 ) -> None:
     """
     Process all code files in a directory for the specified language.
@@ -218,6 +258,8 @@ def process_batch(
         skip_existing: Skip files that already have commented versions
         dry_run: Only show what would be processed
         resume: Resume from previous session
+        workers: Number of files to process concurrently (defaults to
+                 processing.parallel_workers from config)
     """
     language = handler.get_language_name()
     logger.info(f"Starting batch processing for directory: {directory_path}")
@@ -241,13 +283,40 @@ def process_batch(
     # Print scan report
     scanner.print_scan_report(files)
 
-    # Filter files if skip_existing is enabled
-    if skip_existing:
-        original_count = len(files)
-        files = [f for f in files if not should_skip_existing(f)]
-        skipped_count = original_count - len(files)
-        if skipped_count > 0:
-            print(f"\nSkipping {skipped_count} files that already have commented versions")
+    # Initialize progress tracker (loads the previous session when resuming)
+    session_id = None if not resume else "resumable_session"
+    tracker = ProgressTracker(session_id=session_id)
+
+    # Every file completed successfully in the previous session, with the
+    # source hash it was commented from (None for sessions without hashes)
+    processed_hashes = tracker.completed_files if resume else {}
+
+    # Filter files in a single pass over the scan results
+    existing_count = 0
+    resumed_count = 0
+    if skip_existing or processed_hashes:
+        encoding = get_source_encoding(handler)
+        remaining = []
+        for f in files:
+            full_path = f['full_path']
+            # Files whose source changed since they were commented are redone
+            if full_path in processed_hashes and (
+                processed_hashes[full_path] is None
+                or processed_hashes[full_path] == get_source_hash(
+                    Path(full_path).read_text(encoding=encoding, errors='ignore'))
+            ):
+                resumed_count += 1
+            elif skip_existing and should_skip_existing(f):
+                existing_count += 1
+            else:
+                remaining.append(f)
+        files = remaining
+
+        if existing_count > 0:
+            print(f"\nSkipping {existing_count} files that already have commented versions")
+        if resumed_count > 0:
+            print(f"\nSkipping {resumed_count} files already processed in the previous session")
+        if existing_count > 0 or resumed_count > 0:
             print(f"Files to process: {len(files)}")
 
     if dry_run:
@@ -264,52 +333,70 @@ def process_batch(
     # Confirm processing
     print(f"\nReady to process {len(files)} {language.upper()} files.")
 
-    # Initialize progress tracker
-    session_id = None if not resume else "resumable_session"
-    tracker = ProgressTracker(session_id=session_id)
-    tracker.initialize_processing(files, str(root_dir))
+    # Number of files processed concurrently (CLI option overrides config)
+    if workers is None:
+        workers = config_manager.config['processing'].get('parallel_workers', 1)
+    workers = max(1, workers)
+
+    # Resumed files stay part of the total so progress continues from the
+    # previous session instead of restarting against the remaining files
+    tracker.initialize_processing(
+        files, str(root_dir), resumed_files=resumed_count if resume else None
+    )
 
-    # Initialize LLM client and processor
+    # Initialize LLM client (shared by all workers)
     print("\nInitializing two-phase processor...")
     client = InstructorLLMClient(config_manager)
-    processor = TwoPhaseProcessor(client, handler, config=config_manager.config)
-    print(f"Processor initialized for {language.upper()}.\n")
 
-    # Process files
-    print("Starting file processing...\n")
-    print("="*80)
+    # Each worker thread gets its own processor because chunkers keep
+    # per-file state (e.g. adaptive chunk size)
+    thread_state = threading.local()
 
-    for file_info in files:
-        tracker.start_file_processing(file_info)
+    def get_processor() -> TwoPhaseProcessor:
+        if not hasattr(thread_state, 'processor'):
+            thread_state.processor = TwoPhaseProcessor(client, handler, config=config_manager.config)
+        return thread_state.processor
 
-        file_path = Path(file_info['full_path'])
+    get_processor()
+    print(f"Processor initialized for {language.upper()}.\n")
 
-        # Check if we should skip this file
-        if skip_existing and should_skip_existing(file_info):
-            result = FileProcessingResult(
-                file_path=str(file_path),
-                status='skipped',
-                processing_time=0.0,
-                error_message="Output file already exists",
-                original_size=file_info['file_size'],
-                commented_size=0,
-                validation_passed=False
-            )
-            tracker.complete_file_processing(file_info, result)
-            continue
+    def process_batch_file(file_info: Dict[str, str]) -> None:
+        tracker.start_file_processing(file_info)
 
-        # Process the file
+        # Files with existing output were already filtered out above,
+        # so every file reaching this point is processed
         success, result = process_single_file(
-            file_path,
+            Path(file_info['full_path']),
             config_manager,
             client,
-            processor,
+            get_processor(),
             handler,
-            root_directory=root_dir
+            root_directory=root_dir,
+            record_source_hash=resume
         )
 
         tracker.complete_file_processing(file_info, result)
 
+    # Process files
+    print(f"Starting file processing ({workers} worker{'s' if workers > 1 else ''})...\n")
+    print("="*80)
+
+    # Progress is written from a background thread, off the per-file path
+    tracker.start_persistence()
+
+    try:
+        if workers > 1:
+            # LLM calls are I/O-bound, so threads keep several files in flight at once
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for _ in executor.map(process_batch_file, files):
+                    pass
+        else:
+            for file_info in files:
+                process_batch_file(file_info)
+    finally:
+        tracker.stop_persistence()
+        client.close()
+
     print("\n" + "="*80)
     print("Processing complete!")
     print("="*80)
@@ -353,9 +440,16 @@ def process_batch(
     '--resume',
     is_flag=True,
     default=False,
-    help='Resume from previous processing session'
+    help='Resume from previous processing session (files changed since they were commented are processed again)'
 )
-def main(language: str, path: str, config: str, skip_existing: bool, dry_run: bool, resume: bool):
+@click.option(
+    '--workers', '-w',
+    default=None,
+    type=click.IntRange(min=1),
+    help='Number of files to process concurrently (default: processing.parallel_workers)'
+)
+def main(language: str, path: str, config: str, skip_existing: bool, dry_run: bool, resume: bool,
+         workers: Optional[int]):
     """
     Multi-Language Batch Processor - Process code files with two-phase commenting.
 
@@ -432,14 +526,17 @@ def main(language: str, path: str, config: str, skip_existing: bool, dry_run: bo
         processor = TwoPhaseProcessor(client, handler, config=config_manager.config)
 
         # Process the file
-        success, result = process_single_file(
-            path_obj,
-            config_manager,
-            client,
-            processor,
-            handler,
-            root_directory=None
-        )
+        try:
+            success, result = process_single_file(
+                path_obj,
+                config_manager,
+                client,
+                processor,
+                handler,
+                root_directory=None
+            )
+        finally:
+            client.close()
 
         if success:
             print(f"\n✓ File processed successfully!")
@@ -461,7 +558,8 @@ def main(language: str, path: str, config: str, skip_existing: bool, dry_run: bo
             handler,
             skip_existing=skip_existing,
             dry_run=dry_run,
-            resume=resume
+            resume=resume,
+            workers=workers
         )
 
 
@@ -94,7 +94,7 @@ def process_single_file(
     Returns:
         Tuple of (success, FileProcessingResult)
     """
-    start_time = time.time()
+    start_time = time.perf_counter()
 
     try:
         logger.info(f"Processing file: {file_path}")
@@ -120,7 +120,7 @@ def process_single_file(
         )
 
         if not result.success:
-            processing_time = time.time() - start_time
+            processing_time = time.perf_counter() - start_time
             return False, FileProcessingResult(
                 file_path=str(file_path),
                 status='failed',
@@ -138,7 +138,7 @@ def process_single_file(
         with open(output_path, 'w', encoding='latin1', errors='ignore') as f:
             f.write(result.commented_code)
 
-        processing_time = time.time() - start_time
+        processing_time = time.perf_counter() - start_time
 
         logger.info(f"Successfully processed: {file_path} -> {output_path}")
         logger.info(f"Processing time: {processing_time:.2f}s")
@@ -152,11 +152,11 @@ def process_single_file(
             commented_size=len(result.commented_code),
             validation_passed=True,
             processing_method="two_phase",
-            comments_added=len(result.commented_code.split('\n')) - len(vfp_code.split('\n'))
+            comments_added=result.commented_code.count('\n') - vfp_code.count('\n')
         )
 
     except Exception as e:
-        processing_time = time.time() - start_time
+        processing_time = time.perf_counter() - start_time
         logger.error(f"Error processing {file_path}: {e}", exc_info=True)
 
         return False, FileProcessingResult(
@@ -266,35 +266,38 @@ def process_batch(
     print("Starting file processing...\n")
     print("="*80)
 
-    for file_info in files:
-        tracker.start_file_processing(file_info)
-
-        file_path = Path(file_info['full_path'])
-
-        # Check if we should skip this file
-        if skip_existing and should_skip_existing(file_info):
-            result = FileProcessingResult(
-                file_path=str(file_path),
-                status='skipped',
-                processing_time=0.0,
-                error_message="Output file already exists",
-                original_size=file_info['file_size'],
-                commented_size=0,
-                validation_passed=False
+    try:
+        for file_info in files:
+            tracker.start_file_processing(file_info)
+
+            file_path = Path(file_info['full_path'])
+
+            # Check if we should skip this file
+            if skip_existing and should_skip_existing(file_info):
+                result = FileProcessingResult(
+                    file_path=str(file_path),
+                    status='skipped',
+                    processing_time=0.0,
+                    error_message="Output file already exists",
+                    original_size=file_info['file_size'],
+                    commented_size=0,
+                    validation_passed=False
+                )
+                tracker.complete_file_processing(file_info, result)
+                continue
+
+            # Process the file
+            success, result = process_single_file(
+                file_path,
+                config_manager,
+                client,
+                processor,
+                root_directory=vfp_root
             )
-            tracker.complete_file_processing(file_info, result)
-            continue
-
-        # Process the file
-        success, result = process_single_file(
-            file_path,
-            config_manager,
-            client,
-            processor,
-            root_directory=vfp_root
-        )
 
-        tracker.complete_file_processing(file_info, result)
+            tracker.complete_file_processing(file_info, result)
+    finally:
+        client.close()
 
     print("\n" + "="*80)
     print("Processing complete!")
@@ -394,12 +397,15 @@ def main(path: str, config: str, skip_existing: bool, dry_run: bool, resume: boo
         processor = TwoPhaseProcessor(client, config=config_manager.config)
 
         # Process the file
-        success, result = process_single_file(
-            path_obj,
-            config_manager,
-            client,
-            processor
-        )
+        try:
+            success, result = process_single_file(
+                path_obj,
+                config_manager,
+                client,
+                processor
+            )
+        finally:
+            client.close()
 
         if success:
             print("\n" + "="*80)
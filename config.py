@@ -65,7 +65,12 @@ class ConfigManager:
                 "max_tokens": 4000,
                 "timeout": 120,  # Increased timeout for safety
                 "retry_attempts": 3,
-                "retry_delay": 5
+                "retry_delay": 5,
+                "breaker_failure_threshold": 3,  # Connection failures before failing fast
+                "breaker_cool_down": 30,  # Seconds before probing the LLM server again
+                "http2": True,  # Multiplex requests over one connection (requires 'h2')
+                "max_connections": 10,
+                "connect_timeout": 10
             },
             "processing": {
                 "root_directory": "D:/Medical Wizard/VFP Entire Codebase/VFP Comment Settup/VFP_Files_Copy",
@@ -76,6 +81,7 @@ class ConfigManager:
                 "preserve_structure": True,  # CRITICAL: Always preserve structure
                 "skip_patterns": ["_commented", "_pretty", "_backup", "_temp"],
                 "parallel_workers": 1,  # Single-threaded for maximum safety
+                "chunk_batch_size": 1,  # Phase 2 chunk requests sent to the LLM together
                 "validate_before_save": True,  # CRITICAL: Always validate
                 "create_backups": True,  # Create backups before processing
                 "strict_validation": True  # CRITICAL: Strictest validation
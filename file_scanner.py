@@ -139,9 +139,78 @@ class CodeFileScanner:
         Returns:
             True if file matches language extensions, False otherwise
         """
-        file_ext = Path(filename).suffix.lower()
+        file_ext = os.path.splitext(filename)[1].lower()
         return file_ext in self.file_extensions
 
+    def _scan_directory(self, directory: str, prune_folders: bool = True):
+        """
+        Recursively walk a directory with os.scandir, yielding file entries.
+
+        Uses the DirEntry objects directly so file type checks and sizes come
+        from the directory listing instead of separate stat() calls per file.
+        Traversal order matches os.walk (files of a folder first, then its
+        subfolders). Symlinked folders are not followed.
+
+        Args:
+            directory: Directory to walk
+            prune_folders: Skip folders matching should_skip_folder()
+
+        Yields:
+            Tuple of (directory_path, DirEntry) for each file
+        """
+        subdirectories = []
+
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir():
+                            if entry.is_symlink():
+                                continue
+                            if prune_folders and self.should_skip_folder(entry.path):
+                                continue
+                            subdirectories.append(entry.path)
+                        else:
+                            yield directory, entry
+                    except OSError as e:
+                        self.logger.warning(f"Error reading entry {entry.path}: {e}")
+        except OSError as e:
+            self.logger.warning(f"Error scanning directory {directory}: {e}")
+            return
+
+        for subdirectory in subdirectories:
+            yield from self._scan_directory(subdirectory, prune_folders)
+
+    def _build_file_info(self, directory: str, entry: os.DirEntry) -> Dict[str, str]:
+        """
+        Build the file information dictionary for a scanned file.
+
+        Args:
+            directory: Directory containing the file
+            entry: DirEntry for the file
+
+        Returns:
+            File information dictionary (see scan_code_files)
+        """
+        filename = entry.name
+
+        # Generate output filename with _commented suffix
+        name_parts = filename.rsplit('.', 1)
+        if len(name_parts) == 2:
+            output_filename = f"{name_parts[0]}_commented.{name_parts[1]}"
+        else:
+            output_filename = f"{filename}_commented"
+
+        return {
+            'full_path': entry.path,
+            'relative_path': os.path.relpath(entry.path, self.root_directory),
+            'directory': directory,
+            'filename': filename,
+            'output_path': os.path.join(directory, output_filename),
+            # Get file size for validation (cached by scandir on Windows)
+            'file_size': entry.stat().st_size
+        }
+
     def scan_code_files(self) -> List[Dict[str, str]]:
         """
         Recursively scan for code files in the root directory.
@@ -167,54 +236,27 @@ class CodeFileScanner:
 
         self.logger.info(f"Scanning {self.language_name} files in: {self.root_directory}")
 
-        try:
-            for root, dirs, files in os.walk(self.root_directory):
-                root_path = Path(root)
+        root = str(self.root_directory)
 
-                # Filter out directories that should be skipped (modifies dirs in-place)
-                dirs[:] = [d for d in dirs if not self.should_skip_folder(str(root_path / d))]
+        # Skip if the root directory itself should be excluded
+        if self.should_skip_folder(root):
+            return code_files
 
-                # Skip if current directory itself should be excluded
-                if self.should_skip_folder(str(root_path)):
-                    continue
+        for directory, entry in self._scan_directory(root):
+            filename = entry.name
 
-                for filename in files:
-                    if self.is_code_file(filename):
-                        file_path = root_path / filename
-                        full_path_str = str(file_path)
-
-                        # Check file-level skip patterns
-                        if self.should_skip_file(filename, full_path_str):
-                            continue
-
-                        try:
-                            # Generate output filename with _commented suffix
-                            name_parts = filename.rsplit('.', 1)
-                            if len(name_parts) == 2:
-                                output_filename = f"{name_parts[0]}_commented.{name_parts[1]}"
-                            else:
-                                output_filename = f"{filename}_commented"
-
-                            # Get file size for validation
-                            file_size = file_path.stat().st_size
-
-                            file_info = {
-                                'full_path': str(file_path),
-                                'relative_path': str(file_path.relative_to(self.root_directory)),
-                                'directory': str(root_path),
-                                'filename': filename,
-                                'output_path': str(root_path / output_filename),
-                                'file_size': file_size
-                            }
-
-                            code_files.append(file_info)
-
-                        except (OSError, ValueError) as e:
-                            self.logger.warning(f"Error processing file {file_path}: {e}")
-                            continue
+            if not self.is_code_file(filename):
+                continue
 
-        except OSError as e:
-            self.logger.error(f"Error walking directory {self.root_directory}: {e}")
+            # Check file-level skip patterns
+            if self.should_skip_file(filename, entry.path):
+                continue
+
+            try:
+                code_files.append(self._build_file_info(directory, entry))
+            except (OSError, ValueError) as e:
+                self.logger.warning(f"Error processing file {entry.path}: {e}")
+                continue
 
         return code_files
 
@@ -262,7 +304,7 @@ class CodeFileScanner:
             folders[relative_folder]['files'].append(file_info['filename'])
 
             # Extension statistics
-            ext = Path(file_info['filename']).suffix
+            ext = os.path.splitext(file_info['filename'])[1]
             extensions[ext] = extensions.get(ext, 0) + 1
 
             total_size += file_info['file_size']
@@ -394,7 +436,7 @@ class VFPFileScanner(CodeFileScanner):
         Returns:
             True if file matches language extensions, False otherwise
         """
-        file_ext = Path(filename).suffix.lower()
+        file_ext = os.path.splitext(filename)[1].lower()
         return file_ext in self.file_extensions
 
     def is_vfp_file(self, filename: str) -> bool:
@@ -434,42 +476,15 @@ class VFPFileScanner(CodeFileScanner):
             
         self.logger.info(f"Scanning VFP files in: {self.root_directory}")
         
-        try:
-            for root, dirs, files in os.walk(self.root_directory):
-                root_path = Path(root)
-                
-                for filename in files:
-                    if self.is_vfp_file(filename) and not self.should_skip_file(filename):
-                        file_path = root_path / filename
-                        
-                        try:
-                            # Generate output filename with _commented suffix
-                            name_parts = filename.rsplit('.', 1)
-                            if len(name_parts) == 2:
-                                output_filename = f"{name_parts[0]}_commented.{name_parts[1]}"
-                            else:
-                                output_filename = f"{filename}_commented"
-                            
-                            # Get file size for validation
-                            file_size = file_path.stat().st_size
-                            
-                            file_info = {
-                                'full_path': str(file_path),
-                                'relative_path': str(file_path.relative_to(self.root_directory)),
-                                'directory': str(root_path),
-                                'filename': filename,
-                                'output_path': str(root_path / output_filename),
-                                'file_size': file_size
-                            }
-                            
-                            vfp_files.append(file_info)
-                            
-                        except (OSError, ValueError) as e:
-                            self.logger.warning(f"Error processing file {file_path}: {e}")
-                            continue
-                            
-        except OSError as e:
-            self.logger.error(f"Error walking directory {self.root_directory}: {e}")
+        for directory, entry in self._scan_directory(str(self.root_directory), prune_folders=False):
+            filename = entry.name
+
+            if self.is_vfp_file(filename) and not self.should_skip_file(filename):
+                try:
+                    vfp_files.append(self._build_file_info(directory, entry))
+                except (OSError, ValueError) as e:
+                    self.logger.warning(f"Error processing file {entry.path}: {e}")
+                    continue
             
         return vfp_files
     
@@ -514,7 +529,7 @@ class VFPFileScanner(CodeFileScanner):
             folders[relative_folder]['files'].append(file_info['filename'])
             
             # Extension statistics
-            ext = Path(file_info['filename']).suffix
+            ext = os.path.splitext(file_info['filename'])[1]
             extensions[ext] = extensions.get(ext, 0) + 1
             
             total_size += file_info['file_size']
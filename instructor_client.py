@@ -12,9 +12,11 @@ Key Features:
 """
 
 import logging
+import threading
 import time
 from typing import Type, TypeVar, Optional, Dict, Any
 from pydantic import BaseModel, ValidationError
+import httpx
 import instructor
 from openai import OpenAI
 
@@ -64,13 +66,23 @@ class InstructorLLMClient:
         self.retry_attempts = llm_config.get('retry_attempts', 3)
         self.retry_delay = llm_config.get('retry_delay', 5)
 
+        # Circuit breaker: after repeated connection/timeout errors, fail fast
+        # for a cool-down period instead of waiting self.timeout on every call
+        self.breaker_threshold = llm_config.get('breaker_failure_threshold', 3)
+        self.breaker_cool_down = llm_config.get('breaker_cool_down', 30)
+        self._breaker = {'state': 'closed', 'failures': 0, 'opened_at': 0.0, 'probing': False}
+        self._breaker_lock = threading.Lock()
+
         # Initialize OpenAI client for LM Studio
         self.logger.info(f"Connecting to LM Studio endpoint: {self.endpoint}")
 
         try:
+            self.http_client = self._create_http_client(llm_config)
+
             base_client = OpenAI(
                 base_url=self.endpoint,
-                api_key="not-needed"  # LM Studio doesn't require API key
+                api_key="not-needed",  # LM Studio doesn't require API key
+                http_client=self.http_client
             )
 
             # Patch with Instructor for structured output
@@ -108,6 +120,39 @@ class InstructorLLMClient:
 
         return logger
 
+    def _create_http_client(self, llm_config: Dict[str, Any]) -> httpx.Client:
+        """
+        Create the shared HTTP client used for all LM Studio requests.
+
+        HTTP/2 lets concurrent requests share a single connection instead of
+        opening one TCP connection per in-flight request. It requires the
+        optional 'h2' package, so we fall back to HTTP/1.1 when it's missing.
+
+        Args:
+            llm_config: The 'llm' section of the configuration
+
+        Returns:
+            Configured httpx.Client instance
+        """
+        use_http2 = llm_config.get('http2', True)
+        if use_http2:
+            try:
+                import h2  # noqa: F401 - required by httpx for HTTP/2
+            except ImportError:
+                self.logger.info("Package 'h2' not installed - using HTTP/1.1 for LM Studio requests")
+                use_http2 = False
+
+        max_connections = llm_config.get('max_connections', 10)
+
+        return httpx.Client(
+            http2=use_http2,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections
+            ),
+            timeout=httpx.Timeout(self.timeout, connect=llm_config.get('connect_timeout', 10))
+        )
+
     def _test_connection(self) -> None:
         """Test connection to LM Studio"""
         try:
@@ -143,6 +188,83 @@ class InstructorLLMClient:
             self.logger.error(error_msg)
             raise ConnectionError(error_msg)
 
+    def _breaker_allows_request(self) -> bool:
+        """
+        Check the circuit breaker before sending a request to LM Studio.
+
+        While the breaker is open, requests are rejected until the cool-down
+        has elapsed. After that, a single trial request is let through
+        (half-open) to probe whether the server has recovered; other callers
+        keep failing fast while the probe is in flight.
+
+        Returns:
+            True if the request may be sent, False if it should fail fast
+        """
+        with self._breaker_lock:
+            if self._breaker['state'] == 'closed':
+                return True
+
+            if self._breaker['state'] == 'open':
+                if time.monotonic() - self._breaker['opened_at'] < self.breaker_cool_down:
+                    return False
+                self._breaker['state'] = 'half_open'
+                self.logger.info("Circuit breaker half-open - probing LM Studio")
+
+            if self._breaker['probing']:
+                return False
+
+            self._breaker['probing'] = True
+            return True
+
+    def _record_success(self) -> None:
+        """Close the circuit breaker after a successful request"""
+        with self._breaker_lock:
+            if self._breaker['state'] != 'closed':
+                self.logger.info("[OK] LM Studio reachable again - circuit breaker closed")
+            self._breaker.update(state='closed', failures=0, opened_at=0.0, probing=False)
+
+    def _record_connection_failure(self) -> None:
+        """Count a connection/timeout failure and open the breaker at the threshold"""
+        with self._breaker_lock:
+            self._breaker['failures'] += 1
+            self._breaker['probing'] = False
+
+            if (self._breaker['state'] == 'half_open' or
+                    self._breaker['failures'] >= self.breaker_threshold):
+                self._breaker['state'] = 'open'
+                self._breaker['opened_at'] = time.monotonic()
+                self.logger.error(
+                    f"Circuit breaker opened after {self._breaker['failures']} connection failure(s) - "
+                    f"failing fast for {self.breaker_cool_down}s"
+                )
+
+    def _release_probe(self) -> None:
+        """Let another caller probe after a half-open request failed for an unrelated reason"""
+        with self._breaker_lock:
+            self._breaker['probing'] = False
+
+    @staticmethod
+    def _is_connection_error(error: Exception) -> bool:
+        """
+        Check whether an exception (or its cause chain) is a connection/timeout error.
+
+        Instructor may wrap the underlying OpenAI exception, so the whole
+        __cause__/__context__ chain is inspected.
+        """
+        from openai import APIConnectionError, APITimeoutError
+
+        connection_errors = (APIConnectionError, APITimeoutError, ConnectionError, TimeoutError)
+        seen = set()
+        current = error
+
+        while current is not None and id(current) not in seen:
+            if isinstance(current, connection_errors):
+                return True
+            seen.add(id(current))
+            current = current.__cause__ or current.__context__
+
+        return False
+
     def generate_structured(
         self,
         prompt: str,
@@ -176,11 +298,15 @@ class InstructorLLMClient:
         ]
 
         for attempt in range(1, max_retries + 1):
+            if not self._breaker_allows_request():
+                self.logger.error("Circuit breaker open - skipping LLM request (LM Studio unreachable)")
+                return None
+
             try:
                 self.logger.info(f"Generating structured output (attempt {attempt}/{max_retries})")
                 self.logger.debug(f"Response model: {response_model.__name__}")
 
-                start_time = time.time()
+                start_time = time.perf_counter()
 
                 # Use Instructor to enforce structured output
                 result = self.client.chat.completions.create(
@@ -194,13 +320,15 @@ class InstructorLLMClient:
                     **kwargs
                 )
 
-                duration = time.time() - start_time
+                duration = time.perf_counter() - start_time
                 self.logger.info(f"[OK] Structured output generated in {duration:.2f}s")
 
+                self._record_success()
                 return result
 
             except ValidationError as e:
                 self.logger.error(f"Pydantic validation failed on attempt {attempt}: {e}")
+                self._record_success()  # Server responded - only the output was invalid
                 if attempt < max_retries:
                     self.logger.info(f"Retrying in {self.retry_delay} seconds...")
                     time.sleep(self.retry_delay)
@@ -210,6 +338,10 @@ class InstructorLLMClient:
 
             except Exception as e:
                 self.logger.error(f"Error generating structured output on attempt {attempt}: {e}")
+                if self._is_connection_error(e):
+                    self._record_connection_failure()
+                else:
+                    self._release_probe()
                 if attempt < max_retries:
                     self.logger.info(f"Retrying in {self.retry_delay} seconds...")
                     time.sleep(self.retry_delay)
@@ -584,6 +716,10 @@ DO NOT return the code itself."""
             'mode': 'Instructor with JSON mode'
         }
 
+    def close(self) -> None:
+        """Close the shared HTTP client and its pooled connections."""
+        self.http_client.close()
+
 
 def main():
     """Test the Instructor client"""
@@ -0,0 +1,89 @@
+"""
+Comment insertion helpers shared by the chunk comment models.
+
+The ChunkComments/CommentedCode models in vfp_handler.py and in the top-level
+structured_output module insert LLM comments into original code the same
+way; the grouping and insertion loop live here so both use one copy.
+"""
+
+from typing import Any, Dict, List, Sequence
+
+
+def build_comment_buckets(inline_comments: List[Any]) -> Dict[int, List[str]]:
+    """
+    Group inline comment text by insertion line.
+
+    Each block's comment_lines are joined with newlines up front, so
+    assembly appends one string per block. Blocks for the same line
+    keep the order the LLM returned them in.
+
+    Args:
+        inline_comments: CommentBlock models to group
+
+    Returns:
+        Dictionary of insert_before_line to the joined text of each block
+    """
+    buckets = {}
+    for comment_block in inline_comments:
+        buckets.setdefault(comment_block.insert_before_line, []).append(
+            '\n'.join(comment_block.comment_lines))
+    return buckets
+
+
+def insert_comment_buckets(
+    result_lines: List[str],
+    code_lines: Sequence[str],
+    comment_buckets: Dict[int, List[str]],
+    blank_after_code_line: bool = False
+) -> str:
+    """
+    Append code lines to result_lines with inline comments inserted.
+
+    Shared by the assembly methods of ChunkComments and CommentedCode in
+    structured_output.py and vfp_handler.py; the code lines themselves are
+    never modified.
+
+    Args:
+        result_lines: Output lines collected so far (e.g. a file header)
+        code_lines: Original code split into lines (only read, never modified)
+        comment_buckets: Joined comment text grouped by insert_before_line
+        blank_after_code_line: Decide the blank line before each comment from
+                               the code line preceding the insertion point
+                               instead of the last emitted line
+
+    Returns:
+        The assembled code as a single string
+    """
+    # Copy the code between insertion points as whole slices rather
+    # than appending it line by line
+    copied = 0
+    for line_num in sorted(comment_buckets):
+        if line_num > len(code_lines):
+            break
+        result_lines.extend(code_lines[copied:line_num - 1])
+        copied = line_num - 1
+
+        # Code line preceding the insertion point
+        previous_line = code_lines[line_num - 2] if line_num > 1 else ""
+
+        # Insert the comments that belong before this line
+        for comment_text in comment_buckets[line_num]:
+            # Add blank line before comment for readability (unless it's the first line)
+            # (isspace() tests for a blank line without building a stripped copy)
+            if blank_after_code_line:
+                needs_blank = previous_line and not previous_line.isspace()
+            else:
+                needs_blank = (line_num > 1 and result_lines and result_lines[-1]
+                               and not result_lines[-1].isspace())
+            if needs_blank:
+                result_lines.append("")
+
+            # Add comment lines (already joined; a block can be
+            # empty if the validator dropped all of its lines)
+            if comment_text:
+                result_lines.append(comment_text)
+
+    # Add the remaining original code lines (UNMODIFIED)
+    result_lines.extend(code_lines[copied:])
+
+    return '\n'.join(result_lines)
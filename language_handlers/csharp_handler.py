@@ -14,6 +14,7 @@ Target Projects:
 """
 
 import re
+from collections import deque
 from typing import List, Dict, Type, Optional, Tuple, Literal
 from dataclasses import dataclass
 from pydantic import BaseModel, Field, field_validator
@@ -265,27 +266,23 @@ class CSharpChunkComments(BaseModel):
         # Split original code into lines
         code_lines = original_code.split('\n')
 
-        # Sort inline comments by line number
-        sorted_comments = sorted(self.inline_comments, key=lambda c: c.insert_before_line)
-
-        comment_index = 0
+        # Sort inline comments by line number; consumed from the front
+        pending = deque(sorted(self.inline_comments, key=lambda c: c.insert_before_line))
 
         for line_num, code_line in enumerate(code_lines, start=1):
             # Insert any comments that belong before this line
-            while (comment_index < len(sorted_comments) and
-                   sorted_comments[comment_index].insert_before_line == line_num):
-
-                comment_block = sorted_comments[comment_index]
+            while pending and pending[0].insert_before_line == line_num:
+                comment_block = pending.popleft()
 
                 # Add blank line before comment for readability
-                if line_num > 1 and result_lines and result_lines[-1].strip():
+                # (isspace() tests for a blank line without building a stripped copy)
+                if (line_num > 1 and result_lines and result_lines[-1]
+                        and not result_lines[-1].isspace()):
                     result_lines.append("")
 
                 # Add comment lines
                 result_lines.extend(comment_block.comment_lines)
 
-                comment_index += 1
-
             # Add the original code line (UNMODIFIED)
             result_lines.append(code_line)
 
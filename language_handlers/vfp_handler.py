@@ -15,11 +15,47 @@ This consolidates code from:
 """
 
 import re
-from typing import List, Dict, Type, Optional, Tuple
+from functools import lru_cache
+from typing import List, Dict, Type, Optional, Tuple, ClassVar
 from dataclasses import dataclass
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr, field_validator
 
 from .base_handler import LanguageHandler
+from .comment_insertion import build_comment_buckets, insert_comment_buckets
+
+
+# Rule line that opens and closes VFP file header comments
+HEADER_RULE = "* " + "-" * 68
+
+# FoxBin2Prg writes the <Reportes ...> element and its FOXBIN2PRG marker at
+# the top of .fr2/.lb2 files, so report detection only needs to look here
+_REPORT_HEADER_SCAN_CHARS = 4096
+
+# Non-empty CDATA content of report expressions and suppression conditions
+_EXPR_CDATA_RE = re.compile(r'<expr><!\[CDATA\[(.+?)\]\]>', re.IGNORECASE)
+_SUPEXPR_CDATA_RE = re.compile(r'<supexpr><!\[CDATA\[(.+?)\]\]>', re.IGNORECASE)
+
+
+@lru_cache(maxsize=8)
+def _ole_blob_patterns(threshold: int) -> Tuple["re.Pattern", "re.Pattern"]:
+    """
+    Get compiled base64 blob patterns for a minimum blob length.
+
+    Args:
+        threshold: Minimum number of base64 characters to treat as a blob
+
+    Returns:
+        Tuple of (Value="..." pattern, <![CDATA[...]]> pattern)
+    """
+    # Pattern 1: Value="[long base64 string]" (for .sc2 form files)
+    # Matches base64 characters (A-Z, a-z, 0-9, +, /, =) of length >= threshold
+    value_pattern = re.compile(r'(Value\s*=\s*)"([A-Za-z0-9+/=]{' + str(threshold) + r',})"')
+
+    # Pattern 2: <![CDATA[[long base64 string]]]> (for other files with binary CDATA)
+    # Matches CDATA sections with base64 content of length >= threshold
+    cdata_pattern = re.compile(r'(<!\[CDATA\[)([A-Za-z0-9+/=]{' + str(threshold) + r',})(\]\]>)')
+
+    return value_pattern, cdata_pattern
 
 
 # ===== VFP PYDANTIC MODELS =====
@@ -33,6 +69,8 @@ class CommentBlock(BaseModel):
         comment_lines: List of comment lines (each should start with *)
         context: Brief description of what this comment explains
     """
+    model_config = ConfigDict(frozen=True)
+
     insert_before_line: int = Field(
         ...,
         description="Line number where comment should be inserted (1-indexed)",
@@ -53,14 +91,18 @@ class CommentBlock(BaseModel):
     def validate_comment_format(cls, v: List[str]) -> List[str]:
         """Ensure all comment lines start with VFP comment syntax"""
         validated = []
-        for line in v:
-            stripped = line.strip()
-            if not stripped:
-                continue  # Skip empty lines
-            # Ensure it starts with * (VFP comment syntax)
-            if not stripped.startswith('*'):
-                stripped = f"* {stripped}"
-            validated.append(stripped)
+        for entry in v:
+            # An entry may hold several physical lines; each must become a
+            # comment line, or text after a line break would be inserted
+            # into the output as code
+            for line in entry.splitlines():
+                stripped = line.strip()
+                if not stripped:
+                    continue  # Skip empty lines
+                # Ensure it starts with * (VFP comment syntax)
+                if not stripped.startswith('*'):
+                    stripped = f"* {stripped}"
+                validated.append(stripped)
         return validated
 
 
@@ -68,6 +110,8 @@ class FileHeaderComment(BaseModel):
     """
     Structured file header comment following VFP conventions.
     """
+    model_config = ConfigDict(frozen=True)
+
     filename: str = Field(..., description="Name of the VFP file")
     location: str = Field(..., description="Relative path from root")
     purpose: List[str] = Field(
@@ -84,10 +128,57 @@ class FileHeaderComment(BaseModel):
         description="List of main procedures/functions in file"
     )
 
+    @field_validator('filename', 'location')
+    @classmethod
+    def join_multiline_value(cls, v: str) -> str:
+        """Keep single-line header values on one physical line"""
+        lines = v.splitlines()
+        return ' '.join(line.strip() for line in lines) if len(lines) > 1 else v
+
+    @field_validator('purpose', 'dependencies', 'key_functions')
+    @classmethod
+    def split_multiline_items(cls, v: List[str]) -> List[str]:
+        """Split items containing line breaks into one item per line.
+
+        Each item is rendered behind a '*' prefix, so a line break inside
+        an item would otherwise start an uncommented line in the header.
+        """
+        if not any(len(item.splitlines()) > 1 for item in v):
+            return v
+        split_items = []
+        for item in v:
+            lines = item.splitlines()
+            if len(lines) > 1:
+                split_items.extend(line.strip() for line in lines if line.strip())
+            else:
+                split_items.append(item)
+        return split_items
+
+    # Rendered header, keyed on the field values it was built from
+    _cached_vfp: Optional[str] = PrivateAttr(default=None)
+    _cached_vfp_key: Optional[tuple] = PrivateAttr(default=None)
+
     def to_vfp_comment(self) -> str:
-        """Convert to VFP comment format with proper structure"""
+        """Convert to VFP comment format with proper structure.
+
+        The rendered text is cached and rebuilt only when a field changes.
+        """
+        key = (
+            self.filename,
+            self.location,
+            tuple(self.purpose),
+            tuple(self.dependencies),
+            tuple(self.key_functions),
+        )
+        if self._cached_vfp is None or self._cached_vfp_key != key:
+            self._cached_vfp = self._build_vfp_comment()
+            self._cached_vfp_key = key
+        return self._cached_vfp
+
+    def _build_vfp_comment(self) -> str:
+        """Render the header as a VFP comment block"""
         lines = [
-            "* " + "-" * 68,
+            HEADER_RULE,
             f"* File: {self.filename}",
             f"* Location: {self.location}",
             "*",
@@ -95,24 +186,19 @@ class FileHeaderComment(BaseModel):
         ]
 
         # Add purpose lines
-        for purpose_line in self.purpose:
-            lines.append(f"*   {purpose_line}")
+        lines.extend(["*   " + purpose_line for purpose_line in self.purpose])
 
         # Add dependencies if present
         if self.dependencies:
-            lines.append("*")
-            lines.append("* Dependencies:")
-            for dep in self.dependencies:
-                lines.append(f"*   - {dep}")
+            lines.extend(["*", "* Dependencies:"])
+            lines.extend(["*   - " + dep for dep in self.dependencies])
 
         # Add key functions if present
         if self.key_functions:
-            lines.append("*")
-            lines.append("* Key Functions:")
-            for func in self.key_functions:
-                lines.append(f"*   - {func}")
+            lines.extend(["*", "* Key Functions:"])
+            lines.extend(["*   - " + func for func in self.key_functions])
 
-        lines.append("* " + "-" * 68)
+        lines.append(HEADER_RULE)
 
         return "\n".join(lines)
 
@@ -124,6 +210,11 @@ class ChunkComments(BaseModel):
     This model asks the LLM to return ONLY comments, not the original code.
     This is safer because the LLM never touches the code.
     """
+    # insert_comments_into_code() only adds comment lines (the validators
+    # split multi-line entries so every physical line is commented), so the
+    # original code needs no post-insertion preservation check
+    CODE_UNTOUCHED: ClassVar[bool] = True
+
     file_header: FileHeaderComment = Field(
         ...,
         description="Structured file header comment for this chunk"
@@ -133,6 +224,15 @@ class ChunkComments(BaseModel):
         description="List of inline comments to insert at specific positions"
     )
 
+    def get_comment_buckets(self) -> Dict[int, List[str]]:
+        """
+        Get inline comment text grouped by insertion line (see build_comment_buckets).
+
+        Returns:
+            Dictionary of insert_before_line to the joined text of each block
+        """
+        return build_comment_buckets(self.inline_comments)
+
     def insert_comments_into_code(self, original_code: str, include_header: bool = False) -> str:
         """
         Insert comments into original code WITHOUT modifying the code.
@@ -151,39 +251,15 @@ class ChunkComments(BaseModel):
             result_lines.append(self.file_header.to_vfp_comment())
             result_lines.append("")
 
-        # Split original code into lines
-        code_lines = original_code.split('\n')
-
-        # Sort inline comments by line number
-        sorted_comments = sorted(self.inline_comments, key=lambda c: c.insert_before_line)
-
-        # Track which comment we're on
-        comment_index = 0
-
-        for line_num, code_line in enumerate(code_lines, start=1):
-            # Insert any comments that belong before this line
-            while (comment_index < len(sorted_comments) and
-                   sorted_comments[comment_index].insert_before_line == line_num):
-
-                comment_block = sorted_comments[comment_index]
-
-                # Add blank line before comment for readability (unless it's the first line)
-                if line_num > 1 and result_lines and result_lines[-1].strip():
-                    result_lines.append("")
-
-                # Add comment lines
-                result_lines.extend(comment_block.comment_lines)
-
-                comment_index += 1
-
-            # Add the original code line (UNMODIFIED)
-            result_lines.append(code_line)
-
-        return '\n'.join(result_lines)
+        # Inline comments grouped by line number
+        return insert_comment_buckets(
+            result_lines, original_code.split('\n'), self.get_comment_buckets())
 
 
 class ProcedureInfo(BaseModel):
     """Information about a VFP procedure or function"""
+    model_config = ConfigDict(frozen=True)
+
     name: str = Field(..., description="Name of procedure or function")
     line_number: int = Field(..., description="Starting line number (1-indexed)", ge=1)
     description: str = Field(..., description="Brief description of what this procedure/function does")
@@ -562,11 +638,12 @@ Return data in the exact Pydantic model structure specified."""
         # Standard VFP code analysis
         code_for_analysis, was_sampled = self.extract_code_sample(code)
         sampling_note = "\n⚠️ Note: This is a SAMPLE of a large file. Focus on identifying structure and patterns." if was_sampled else ""
+        line_count = len(code.splitlines())
 
         return f"""Analyze the structure of this VFP file.
 
 File: {filename}
-Lines: {len(code.splitlines())}{sampling_note}
+Lines: {line_count}{sampling_note}
 
 Return a FileAnalysis object with these fields:
 1. filename: "{filename}"
@@ -576,7 +653,7 @@ Return a FileAnalysis object with these fields:
    - line_number: starting line (count from 1)
    - description: brief description
 4. dependencies: List of tables (SELECT, UPDATE, USE), variables, external files
-5. total_lines: {len(code.splitlines())}
+5. total_lines: {line_count}
 
 VFP Code:
 ```vfp
@@ -723,8 +800,9 @@ Return ONLY valid JSON. Explain EACH expression."""
 
     def validate_comment_syntax(self, comment: str, comment_type: str = None) -> bool:
         """Validate that comment follows VFP syntax (* or &&)"""
-        stripped = comment.strip()
-        return stripped.startswith('*') or '&&' in stripped
+        # Only leading whitespace affects the '*' check, and '&&' can be
+        # searched for in the unstripped string
+        return comment.lstrip().startswith('*') or '&&' in comment
 
     def format_file_header(self, header_data: dict) -> str:
         """Format VFP file header comment"""
@@ -823,7 +901,10 @@ Return ONLY valid JSON. Explain EACH expression."""
         Returns:
             bool: True if this is a report/label file
         """
-        return '<Reportes' in code and 'FOXBIN2PRG' in code
+        # Only the header is checked, so large non-report files (e.g. forms
+        # with base64 OLE data) are not scanned end to end
+        head = code[:_REPORT_HEADER_SCAN_CHARS]
+        return '<Reportes' in head and 'FOXBIN2PRG' in head
 
     def _extract_report_name(self, code: str) -> str:
         """Extract the original report filename from FoxBin2Prg header."""
@@ -850,8 +931,8 @@ Return ONLY valid JSON. Explain EACH expression."""
         lines = code.split('\n')
 
         # Patterns for non-empty CDATA content
-        expr_pattern = re.compile(r'<expr><!\[CDATA\[(.+?)\]\]>', re.IGNORECASE)
-        supexpr_pattern = re.compile(r'<supexpr><!\[CDATA\[(.+?)\]\]>', re.IGNORECASE)
+        expr_pattern = _EXPR_CDATA_RE
+        supexpr_pattern = _SUPEXPR_CDATA_RE
 
         for i, line in enumerate(lines, 1):
             # Extract <expr> content (skip printer config lines)
@@ -956,36 +1037,28 @@ Return ONLY valid JSON. Explain EACH expression."""
         if not strip_enabled:
             return code
 
-        cleaned_code = code
-        total_bytes_removed = 0
-        total_blobs_found = 0
-
-        # Pattern 1: Value="[long base64 string]" (for .sc2 form files)
-        # Matches base64 characters (A-Z, a-z, 0-9, +, /, =) of length >= threshold
-        pattern1 = r'(Value\s*=\s*)"([A-Za-z0-9+/=]{' + str(threshold) + r',})"'
-        replacement1 = r'\1"[OLE_BINARY_DATA_REMOVED_FOR_LLM_PROCESSING]"'
-
-        blobs_pattern1 = re.findall(pattern1, cleaned_code)
-        if blobs_pattern1:
-            bytes_removed_p1 = sum(len(match[1]) for match in blobs_pattern1)
-            cleaned_code = re.sub(pattern1, replacement1, cleaned_code)
-            total_bytes_removed += bytes_removed_p1
-            total_blobs_found += len(blobs_pattern1)
-
-        # Pattern 2: <![CDATA[[long base64 string]]]> (for other files with binary CDATA)
-        # Matches CDATA sections with base64 content of length >= threshold
-        pattern2 = r'(<!\[CDATA\[)([A-Za-z0-9+/=]{' + str(threshold) + r',})(\]\]>)'
-        replacement2 = r'\1[BINARY_DATA_REMOVED_FOR_LLM_PROCESSING]\3'
-
-        blobs_pattern2 = re.findall(pattern2, cleaned_code)
-        if blobs_pattern2:
-            bytes_removed_p2 = sum(len(match[1]) for match in blobs_pattern2)
-            cleaned_code = re.sub(pattern2, replacement2, cleaned_code)
-            total_bytes_removed += bytes_removed_p2
-            total_blobs_found += len(blobs_pattern2)
+        value_pattern, cdata_pattern = _ole_blob_patterns(threshold)
+
+        # Sizes of the blobs replaced, recorded during substitution so each
+        # pattern scans the code only once
+        blob_sizes = []
+
+        def strip_value_blob(match) -> str:
+            blob_sizes.append(len(match.group(2)))
+            return match.group(1) + '"[OLE_BINARY_DATA_REMOVED_FOR_LLM_PROCESSING]"'
+
+        def strip_cdata_blob(match) -> str:
+            blob_sizes.append(len(match.group(2)))
+            return match.group(1) + '[BINARY_DATA_REMOVED_FOR_LLM_PROCESSING]' + match.group(3)
+
+        cleaned_code = value_pattern.sub(strip_value_blob, code)
+        cleaned_code = cdata_pattern.sub(strip_cdata_blob, cleaned_code)
+
+        total_blobs_found = len(blob_sizes)
+        total_bytes_removed = sum(blob_sizes)
 
         # Log if stripping occurred
-        if cleaned_code != code:
+        if blob_sizes:
             import logging
             logger = logging.getLogger('vfp_handler')
             logger.info(f"Stripped {total_blobs_found} base64 blob(s) containing {total_bytes_removed:,} bytes of data")
@@ -14,13 +14,19 @@ Features:
 
 import json
 import logging
+import os
 import time
-from datetime import datetime, timedelta
+from collections import Counter, deque
 from pathlib import Path
-from typing import Dict, List, Any, Optional
-from dataclasses import dataclass, asdict
+from typing import Deque, Dict, List, Any, Optional
+from dataclasses import dataclass, fields
 import threading
 
+try:
+    import orjson  # Optional: faster progress file serialization
+except ImportError:
+    orjson = None
+
 @dataclass
 class FileProcessingResult:
     """Result of processing a single file."""
@@ -33,6 +39,7 @@ class FileProcessingResult:
     validation_passed: bool = False
     processing_method: str = "two_phase"  # Track processing method used
     comments_added: int = 0  # Track number of comment lines added
+    source_hash: Optional[str] = None  # Source hash, recorded when resuming to detect changes
 
 @dataclass
 class FolderStats:
@@ -46,6 +53,25 @@ class FolderStats:
     total_processing_time: float
     status: str  # 'pending', 'in_progress', 'completed', 'failed'
 
+_RESULT_FIELDS = tuple(f.name for f in fields(FileProcessingResult))
+_FOLDER_FIELDS = tuple(f.name for f in fields(FolderStats))
+
+def _snapshot(obj: Any, field_names: tuple) -> Dict[str, Any]:
+    """
+    Copy a flat dataclass into a dictionary.
+    
+    All tracker dataclass fields are plain values, so a shallow copy is
+    enough; dataclasses.asdict would deep-copy every field on each save.
+    
+    Args:
+        obj: Dataclass instance
+        field_names: Names of the fields to copy
+        
+    Returns:
+        Dictionary of field name to value
+    """
+    return {name: getattr(obj, name) for name in field_names}
+
 class ProgressTracker:
     """
     Comprehensive progress tracker for VFP file processing.
@@ -54,16 +80,36 @@ class ProgressTracker:
     and session persistence for resumable processing.
     """
     
-    def __init__(self, session_id: Optional[str] = None, progress_file: str = "processing_progress.json"):
+    BAR_WIDTH = 30  # Progress bar width in characters
+    _BAR_FULL = '█' * BAR_WIDTH
+    _BAR_EMPTY = '░' * BAR_WIDTH
+    
+    # Folder status icons for the folder summary
+    _STATUS_ICONS = {
+        'pending': '⏳',
+        'in_progress': '⏳',
+        'completed': '✅',
+        'completed_with_errors': '⚠️',
+        'failed': '❌'
+    }
+    
+    MAX_SAVED_RESULTS = 100  # Most recent file results kept and persisted
+    MAX_FAILED_RESULTS = 1000  # Failed file results kept for the final report
+    
+    def __init__(self, session_id: Optional[str] = None, progress_file: str = "processing_progress.json",
+                 save_interval: float = 1.0):
         """
         Initialize the progress tracker.
         
         Args:
             session_id: Unique session identifier, auto-generated if None
             progress_file: Path to progress persistence file
+            save_interval: Minimum seconds between progress file writes while
+                           background persistence is running
         """
         self.session_id = session_id or self._generate_session_id()
         self.progress_file = progress_file
+        self.save_interval = save_interval
         self.logger = self._setup_logger()
         
         # Progress data
@@ -79,22 +125,43 @@ class ProgressTracker:
         # Folder tracking
         self.folder_stats: Dict[str, FolderStats] = {}
         self.current_folder = None
+        self._folder_key_cache: Dict[str, str] = {}  # directory -> relative folder
+        self.folders_completed = 0
+        
+        # File results (only the most recent ones are kept and persisted)
+        self.processing_results: Deque[FileProcessingResult] = deque(maxlen=self.MAX_SAVED_RESULTS)
+        self.failed_results: Deque[FileProcessingResult] = deque(maxlen=self.MAX_FAILED_RESULTS)
         
-        # File results
-        self.processing_results: List[FileProcessingResult] = []
+        # Every successfully processed file, mapped to the source hash it was
+        # commented from; unlike processing_results this is never capped, as
+        # resuming relies on it to skip completed files
+        self.completed_files: Dict[str, Optional[str]] = {}
         
         # Performance tracking
         self.total_processing_time = 0.0
-        self.average_processing_time = 0.0
+        
+        # Console redraw throttling (seconds between progress bar redraws)
+        self.display_interval = 0.5
+        self._last_display_time = 0.0
         
         # Thread safety
         self._lock = threading.Lock()
         
+        # Background persistence (see start_persistence)
+        self._save_requested = threading.Event()
+        self._stop_persistence = threading.Event()
+        self._persistence_thread: Optional[threading.Thread] = None
+        
         self.logger.info(f"Progress tracker initialized for session: {self.session_id}")
         
         # Load existing progress if available
         self._load_progress()
     
+    @property
+    def average_processing_time(self) -> float:
+        """Average processing time per processed file, in seconds."""
+        return self.total_processing_time / self.files_processed if self.files_processed else 0.0
+    
     def _setup_logger(self) -> logging.Logger:
         """Setup logging for progress tracking."""
         logger = logging.getLogger('progress_tracker')
@@ -112,43 +179,80 @@ class ProgressTracker:
     
     def _generate_session_id(self) -> str:
         """Generate a unique session ID."""
-        return datetime.now().strftime("%Y%m%d_%H%M%S")
+        return time.strftime("%Y%m%d_%H%M%S")
     
-    def initialize_processing(self, files: List[Dict[str, str]], root_directory: str) -> None:
+    def initialize_processing(
+        self,
+        files: List[Dict[str, str]],
+        root_directory: str,
+        resumed_files: Optional[int] = None
+    ) -> None:
         """
         Initialize processing with the list of files to process.
         
         Args:
             files: List of file information dictionaries
             root_directory: Root directory path for relative path calculation
+            resumed_files: When resuming, the number of files completed in the
+                           previous session and left out of files; they count
+                           towards the total and as already processed
         """
         with self._lock:
             self.total_files = len(files)
             self.root_directory = root_directory
             
+            if resumed_files is not None:
+                # Counters loaded from the previous session also include its
+                # failures, which are retried now; restart them from the
+                # resumed files so progress stays within the total
+                self.total_files += resumed_files
+                self.current_file_index = resumed_files
+                self.files_processed = resumed_files
+                self.files_successful = resumed_files
+                self.files_failed = 0
+                self.files_skipped = 0
+                self.validation_failures = 0
+            
             # Group files by folder
             self.folder_stats = {}
+            self._folder_key_cache = {}
+            self.folders_completed = 0
             
-            for file_info in files:
-                folder_path = str(Path(file_info['directory']).relative_to(root_directory))
-                
-                if folder_path not in self.folder_stats:
-                    self.folder_stats[folder_path] = FolderStats(
-                        folder_path=folder_path,
-                        total_files=0,
-                        processed_files=0,
-                        successful_files=0,
-                        failed_files=0,
-                        skipped_files=0,
-                        total_processing_time=0.0,
-                        status='pending'
-                    )
-                
-                self.folder_stats[folder_path].total_files += 1
+            folder_counts = Counter(self._get_folder_key(file_info['directory']) for file_info in files)
+            
+            for folder_path, file_count in folder_counts.items():
+                self.folder_stats[folder_path] = FolderStats(
+                    folder_path=folder_path,
+                    total_files=file_count,
+                    processed_files=0,
+                    successful_files=0,
+                    failed_files=0,
+                    skipped_files=0,
+                    total_processing_time=0.0,
+                    status='pending'
+                )
             
             self.logger.info(f"Initialized processing: {self.total_files} files in {len(self.folder_stats)} folders")
             self._save_progress()
     
+    def _get_folder_key(self, directory: str) -> str:
+        """
+        Get the folder_stats key (path relative to the root) for a directory.
+        
+        Results are cached since every file in a folder maps to the same key.
+        
+        Args:
+            directory: Directory containing a file
+            
+        Returns:
+            Directory path relative to the root directory
+        """
+        folder_path = self._folder_key_cache.get(directory)
+        if folder_path is None:
+            folder_path = str(Path(directory).relative_to(self.root_directory))
+            self._folder_key_cache[directory] = folder_path
+        return folder_path
+    
     def start_file_processing(self, file_info: Dict[str, str]) -> None:
         """
         Mark the start of processing for a file.
@@ -160,14 +264,21 @@ class ProgressTracker:
             self.current_file_index += 1
             
             # Update current folder
-            folder_path = str(Path(file_info['directory']).relative_to(self.root_directory))
+            folder_path = self._get_folder_key(file_info['directory'])
             if folder_path != self.current_folder:
                 self.current_folder = folder_path
-                if folder_path in self.folder_stats:
-                    self.folder_stats[folder_path].status = 'in_progress'
+                folder_stat = self.folder_stats.get(folder_path)
+                if folder_stat is not None:
+                    folder_stat.status = 'in_progress'
                     
-            self.logger.info(f"Starting file {self.current_file_index}/{self.total_files}: {file_info['filename']}")
-            self._update_display()
+            file_index = self.current_file_index
+            progress_line = self._render_progress()
+        
+        # Logging and console output happen outside the lock so workers
+        # only serialize on the counter updates. Per-file messages use lazy
+        # %-formatting so nothing is formatted when INFO is disabled.
+        self.logger.info("Starting file %d/%d: %s", file_index, self.total_files, file_info['filename'])
+        self._update_display(progress_line)
     
     def complete_file_processing(self, file_info: Dict[str, str], result: FileProcessingResult) -> None:
         """
@@ -177,56 +288,142 @@ class ProgressTracker:
             file_info: File information dictionary
             result: Processing result
         """
+        status = result.status
+        processing_time = result.processing_time
+        
         with self._lock:
             self.files_processed += 1
             self.processing_results.append(result)
-            self.total_processing_time += result.processing_time
+            if status == 'failed':
+                self.failed_results.append(result)
+            elif status == 'success':
+                self.completed_files[result.file_path] = result.source_hash
+            self.total_processing_time += processing_time
             
             # Update folder statistics
-            folder_path = str(Path(file_info['directory']).relative_to(self.root_directory))
-            if folder_path in self.folder_stats:
-                folder_stat = self.folder_stats[folder_path]
+            folder_stat = self.folder_stats.get(self._get_folder_key(file_info['directory']))
+            if folder_stat is not None:
                 folder_stat.processed_files += 1
-                folder_stat.total_processing_time += result.processing_time
+                folder_stat.total_processing_time += processing_time
                 
-                if result.status == 'success':
+                if status == 'success':
                     self.files_successful += 1
                     folder_stat.successful_files += 1
-                elif result.status == 'failed':
+                elif status == 'failed':
                     self.files_failed += 1
                     folder_stat.failed_files += 1
-                elif result.status == 'skipped':
+                elif status == 'skipped':
                     self.files_skipped += 1
                     folder_stat.skipped_files += 1
                 
-                if not result.validation_passed and result.status != 'skipped':
+                if not result.validation_passed and status != 'skipped':
                     self.validation_failures += 1
                 
                 # Check if folder is complete
                 if folder_stat.processed_files >= folder_stat.total_files:
+                    if not folder_stat.status.startswith('completed'):
+                        self.folders_completed += 1
                     if folder_stat.failed_files == 0:
                         folder_stat.status = 'completed'
                     else:
                         folder_stat.status = 'completed_with_errors'
             
-            # Update average processing time
-            if self.files_processed > 0:
-                self.average_processing_time = self.total_processing_time / self.files_processed
+            progress_line = self._render_progress()
             
-            self.logger.info(f"Completed file: {result.file_path} [{result.status}] in {result.processing_time:.2f}s")
-            self._update_display()
+            if self._persistence_thread is None:
+                self._save_progress()
+        
+        if self._persistence_thread is not None:
+            self._save_requested.set()
+        
+        self.logger.info("Completed file: %s [%s] in %.2fs", result.file_path, status, processing_time)
+        self._update_display(progress_line)
+    
+    def start_persistence(self) -> None:
+        """
+        Start writing progress from a background thread.
+        
+        While running, completed files only request a save; the background
+        thread coalesces requests and writes the progress file at most once
+        per save_interval, keeping the JSON dump off the processing path.
+        Call stop_persistence() when processing finishes.
+        """
+        if self._persistence_thread is not None:
+            return
+        
+        self._stop_persistence.clear()
+        self._persistence_thread = threading.Thread(
+            target=self._persistence_loop,
+            name='progress-persistence',
+            daemon=True
+        )
+        self._persistence_thread.start()
+    
+    def stop_persistence(self) -> None:
+        """Stop background persistence and write the final progress state."""
+        if self._persistence_thread is None:
+            return
+        
+        self._stop_persistence.set()
+        self._save_requested.set()
+        self._persistence_thread.join()
+        self._persistence_thread = None
+        
+        with self._lock:
             self._save_progress()
     
-    def _update_display(self) -> None:
-        """Update the console display with current progress."""
+    def _persistence_loop(self) -> None:
+        """Write requested progress saves, at most once per save_interval."""
+        while not self._stop_persistence.is_set():
+            self._save_requested.wait()
+            if self._stop_persistence.is_set():
+                break
+            self._save_requested.clear()
+            
+            with self._lock:
+                progress_data = self._get_progress_data()
+            self._write_progress(progress_data)
+            
+            # Debounce: saves requested meanwhile are written in one go
+            self._stop_persistence.wait(self.save_interval)
+    
+    def _update_display(self, progress_line: Optional[str]) -> None:
+        """
+        Update the console display with current progress.
+        
+        Args:
+            progress_line: Text from _render_progress(), or None to skip the redraw
+        """
+        if progress_line is not None:
+            print(progress_line, end='', flush=True)
+    
+    def _render_progress(self) -> Optional[str]:
+        """
+        Render the progress bar line for the current state.
+        
+        Must be called with the lock held so the counters are consistent.
+        
+        Returns:
+            Progress text (starting with a carriage return so it overwrites the
+            previous line), or None if the redraw is throttled
+        """
         if self.total_files == 0:
-            return
+            return None
+        
+        # Completion and every 10th file always get a line of their own;
+        # other redraws are throttled so fast runs (e.g. many skipped files)
+        # don't flush stdout twice per file
+        milestone = self.files_processed >= self.total_files or self.files_processed % 10 == 0
+        now = time.time()
+        if not milestone and now - self._last_display_time < self.display_interval:
+            return None
+        self._last_display_time = now
         
         # Calculate progress percentage
         progress_pct = (self.files_processed / self.total_files) * 100
         
         # Calculate estimated time remaining
-        elapsed_time = time.time() - self.start_time
+        elapsed_time = now - self.start_time
         if self.files_processed > 0:
             estimated_total_time = (elapsed_time / self.files_processed) * self.total_files
             estimated_remaining = estimated_total_time - elapsed_time
@@ -234,9 +431,8 @@ class ProgressTracker:
             estimated_remaining = 0
         
         # Create progress bar
-        bar_width = 30
-        filled_width = int((progress_pct / 100) * bar_width)
-        bar = '█' * filled_width + '░' * (bar_width - filled_width)
+        filled_width = int((progress_pct / 100) * self.BAR_WIDTH)
+        bar = self._BAR_FULL[:filled_width] + self._BAR_EMPTY[filled_width:]
         
         # Format times
         elapsed_str = self._format_time(elapsed_time)
@@ -245,14 +441,16 @@ class ProgressTracker:
         # Current file info
         current_file = "Starting..." if self.current_file_index == 0 else f"File {self.current_file_index}/{self.total_files}"
         
-        # Print progress (using \r to overwrite previous line)
-        print(f"\r{current_file} [{bar}] {progress_pct:.1f}% | "
-              f"✓{self.files_successful} ✗{self.files_failed} ⊘{self.files_skipped} | "
-              f"Time: {elapsed_str} | ETA: {remaining_str}", end='', flush=True)
+        # Progress line (using \r to overwrite previous line)
+        progress_line = (f"\r{current_file} [{bar}] {progress_pct:.1f}% | "
+                         f"✓{self.files_successful} ✗{self.files_failed} ⊘{self.files_skipped} | "
+                         f"Time: {elapsed_str} | ETA: {remaining_str}")
+        
+        # Newline for completed processing or major milestones
+        if milestone:
+            progress_line += "\n"
         
-        # Print newline for completed processing or major milestones
-        if self.files_processed >= self.total_files or self.files_processed % 10 == 0:
-            print()  # Add newline
+        return progress_line
     
     def _format_time(self, seconds: float) -> str:
         """Format time in seconds to HH:MM:SS format."""
@@ -275,13 +473,7 @@ class ProgressTracker:
         print("="*80)
         
         for folder_path, stats in sorted(self.folder_stats.items()):
-            status_icon = {
-                'pending': '⏳',
-                'in_progress': '⏳',
-                'completed': '✅',
-                'completed_with_errors': '⚠️',
-                'failed': '❌'
-            }.get(stats.status, '❓')
+            status_icon = self._STATUS_ICONS.get(stats.status, '❓')
             
             folder_display = folder_path if folder_path != '.' else '[Root]'
             
@@ -327,7 +519,7 @@ class ProgressTracker:
         self.print_folder_summary()
         
         # Print failed files if any
-        failed_results = [r for r in self.processing_results if r.status == 'failed']
+        failed_results = list(self.failed_results)
         if failed_results:
             print("FAILED FILES:")
             print("-" * 40)
@@ -343,26 +535,47 @@ class ProgressTracker:
     
     def _save_progress(self) -> None:
         """Save current progress to file for resumability."""
+        self._write_progress(self._get_progress_data())
+    
+    def _get_progress_data(self) -> Dict[str, Any]:
+        """Snapshot the current progress as a JSON-serializable dictionary."""
+        return {
+            'session_id': self.session_id,
+            'start_time': self.start_time,
+            'total_files': self.total_files,
+            'current_file_index': self.current_file_index,
+            'files_processed': self.files_processed,
+            'files_successful': self.files_successful,
+            'files_failed': self.files_failed,
+            'files_skipped': self.files_skipped,
+            'validation_failures': self.validation_failures,
+            'total_processing_time': self.total_processing_time,
+            'current_folder': self.current_folder,
+            'folder_stats': {k: _snapshot(v, _FOLDER_FIELDS) for k, v in self.folder_stats.items()},
+            'processing_results': [_snapshot(r, _RESULT_FIELDS) for r in self.processing_results],
+            'completed_files': dict(self.completed_files),
+            'last_updated': time.strftime("%Y-%m-%dT%H:%M:%S")
+        }
+    
+    def _write_progress(self, progress_data: Dict[str, Any]) -> None:
+        """
+        Write a progress snapshot to the progress file.
+        
+        The snapshot is written to a temporary file and moved into place so
+        an interrupted write never leaves a truncated progress file behind.
+        
+        Args:
+            progress_data: Snapshot from _get_progress_data()
+        """
         try:
-            progress_data = {
-                'session_id': self.session_id,
-                'start_time': self.start_time,
-                'total_files': self.total_files,
-                'current_file_index': self.current_file_index,
-                'files_processed': self.files_processed,
-                'files_successful': self.files_successful,
-                'files_failed': self.files_failed,
-                'files_skipped': self.files_skipped,
-                'validation_failures': self.validation_failures,
-                'total_processing_time': self.total_processing_time,
-                'current_folder': self.current_folder,
-                'folder_stats': {k: asdict(v) for k, v in self.folder_stats.items()},
-                'processing_results': [asdict(r) for r in self.processing_results[-100:]],  # Keep last 100
-                'last_updated': datetime.now().isoformat()
-            }
-            
-            with open(self.progress_file, 'w', encoding='utf-8') as f:
-                json.dump(progress_data, f, indent=2, ensure_ascii=False)
+            temp_file = f"{self.progress_file}.tmp"
+            if orjson is not None:
+                with open(temp_file, 'wb') as f:
+                    f.write(orjson.dumps(progress_data, option=orjson.OPT_INDENT_2))
+            else:
+                with open(temp_file, 'w', encoding='utf-8') as f:
+                    json.dump(progress_data, f, indent=2, ensure_ascii=False)
+            os.replace(temp_file, self.progress_file)
                 
         except Exception as e:
             self.logger.warning(f"Could not save progress: {e}")
@@ -370,11 +583,15 @@ class ProgressTracker:
     def _load_progress(self) -> None:
         """Load progress from file if it exists."""
         try:
-            if not Path(self.progress_file).exists():
+            if not os.path.exists(self.progress_file):
                 return
             
-            with open(self.progress_file, 'r', encoding='utf-8') as f:
-                progress_data = json.load(f)
+            if orjson is not None:
+                with open(self.progress_file, 'rb') as f:
+                    progress_data = orjson.loads(f.read())
+            else:
+                with open(self.progress_file, 'r', encoding='utf-8') as f:
+                    progress_data = json.load(f)
             
             # Only load if session IDs match (for resuming)
             if progress_data.get('session_id') == self.session_id:
@@ -394,12 +611,30 @@ class ProgressTracker:
                 self.folder_stats = {}
                 for folder_path, stats_dict in folder_stats_data.items():
                     self.folder_stats[folder_path] = FolderStats(**stats_dict)
+                self.folders_completed = sum(
+                    1 for stats in self.folder_stats.values() if stats.status.startswith('completed')
+                )
                 
                 # Load processing results
                 results_data = progress_data.get('processing_results', [])
-                self.processing_results = []
+                self.processing_results.clear()
+                self.failed_results.clear()
                 for result_dict in results_data:
-                    self.processing_results.append(FileProcessingResult(**result_dict))
+                    result = FileProcessingResult(**result_dict)
+                    self.processing_results.append(result)
+                    if result.status == 'failed':
+                        self.failed_results.append(result)
+                
+                # Load completed files (progress files written before this map
+                # existed only have the recent results to go on)
+                completed_files = progress_data.get('completed_files')
+                if completed_files is None:
+                    completed_files = {
+                        result.file_path: result.source_hash
+                        for result in self.processing_results
+                        if result.status == 'success'
+                    }
+                self.completed_files = dict(completed_files)
                 
                 self.logger.info(f"Loaded progress: {self.files_processed}/{self.total_files} files processed")
             
@@ -410,26 +645,41 @@ class ProgressTracker:
         """
         Get current progress summary as a dictionary.
         
+        Counters are read under the lock so the summary is a consistent
+        snapshot even while workers are completing files; derived values
+        are computed afterwards from that snapshot.
+        
         Returns:
             Dictionary containing progress summary
         """
+        with self._lock:
+            total_files = self.total_files
+            files_processed = self.files_processed
+            counters = {
+                'files_successful': self.files_successful,
+                'files_failed': self.files_failed,
+                'files_skipped': self.files_skipped,
+                'validation_failures': self.validation_failures
+            }
+            total_processing_time = self.total_processing_time
+            current_folder = self.current_folder
+            folders_total = len(self.folder_stats)
+            folders_completed = self.folders_completed
+        
         elapsed_time = time.time() - self.start_time
-        progress_pct = (self.files_processed / self.total_files * 100) if self.total_files > 0 else 0
+        progress_pct = (files_processed / total_files * 100) if total_files > 0 else 0
         
         return {
             'session_id': self.session_id,
-            'total_files': self.total_files,
-            'files_processed': self.files_processed,
-            'files_successful': self.files_successful,
-            'files_failed': self.files_failed,
-            'files_skipped': self.files_skipped,
-            'validation_failures': self.validation_failures,
+            'total_files': total_files,
+            'files_processed': files_processed,
+            **counters,
             'progress_percentage': progress_pct,
             'elapsed_time': elapsed_time,
-            'average_processing_time': self.average_processing_time,
-            'current_folder': self.current_folder,
-            'folders_total': len(self.folder_stats),
-            'folders_completed': len([f for f in self.folder_stats.values() if f.status.startswith('completed')])
+            'average_processing_time': total_processing_time / files_processed if files_processed else 0.0,
+            'current_folder': current_folder,
+            'folders_total': folders_total,
+            'folders_completed': folders_completed
         }
 
 def main():
@@ -7,8 +7,122 @@ The key principle: LLM returns code and comments SEPARATELY so we can validate
 that original code is preserved exactly.
 """
 
-from pydantic import BaseModel, Field, field_validator
-from typing import List, Optional
+import re
+from collections import Counter
+from functools import lru_cache
+from itertools import zip_longest
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr, field_validator
+from typing import Callable, ClassVar, Dict, List, Optional, Tuple
+
+from language_handlers.comment_insertion import build_comment_buckets, insert_comment_buckets
+
+
+# Rule line that opens and closes VFP file header comments
+HEADER_RULE = "* " + "-" * 68
+
+# Full-line VFP comment: optional whitespace (not crossing a newline), then '*'
+_COMMENT_LINE_RE = re.compile(r'^[^\S\n]*\*', re.MULTILINE)
+
+# Text of a full-line VFP comment, from the '*' to the end of the line
+_COMMENT_TEXT_RE = re.compile(r'^[^\S\n]*(\*[^\n]*)', re.MULTILINE)
+
+# A full-line VFP comment together with the newline that precedes it
+_NEWLINE_COMMENT_LINE_RE = re.compile(r'\n[^\S\n]*\*[^\n]*')
+
+# Run of consecutive full-line VFP comments (one match per comment block)
+_COMMENT_BLOCK_RE = re.compile(r'^[^\S\n]*\*[^\n]*(?:\n[^\S\n]*\*[^\n]*)*', re.MULTILINE)
+
+# Characters treated as token separators when extracting code terms
+_TOKEN_SEPARATORS = str.maketrans('(),', '   ')
+
+
+# Header comment render method per file header class (None if it has none),
+# filled in by CommentQualityValidator._get_header_comment_text
+_HEADER_RENDERERS: Dict[type, Optional[Callable[..., str]]] = {}
+
+
+@lru_cache(maxsize=16)
+def _split_code_lines(code: str) -> Tuple[str, ...]:
+    """
+    Split code on '\\n', reusing the result for repeated calls.
+
+    A chunk's original code is split by the quality validator, the
+    insertion validators, the assembler and the metrics in turn; caching
+    the split lets those stages share one pass. A tuple is returned so
+    callers cannot modify the shared result.
+
+    Args:
+        code: Source code to split
+
+    Returns:
+        Tuple of lines
+    """
+    return tuple(code.split('\n'))
+
+
+def _file_context_members(file_context) -> Tuple[list, list]:
+    """
+    Get the dependencies and procedures of a Phase 1 analysis.
+
+    Works with both VFP (dependencies/procedures) and C#
+    (external_dependencies/methods) models.
+
+    Args:
+        file_context: FileAnalysis or CSharpFileAnalysis
+
+    Returns:
+        Tuple of (dependencies, procedures), each empty if not present
+    """
+    deps = getattr(file_context, 'dependencies', None) or getattr(file_context, 'external_dependencies', None)
+    procs = getattr(file_context, 'procedures', None) or getattr(file_context, 'methods', None)
+    return deps or [], procs or []
+
+
+@lru_cache(maxsize=16)
+def _dependency_search_terms(dependencies: Tuple[str, ...]) -> Tuple[Tuple[str, ...], ...]:
+    """
+    Get the lowercased key terms (> 3 chars) of each dependency.
+
+    The Phase 1 dependency list is the same for every chunk of a file, so
+    the terms are computed once and reused by later chunks.
+
+    Args:
+        dependencies: Dependency strings from Phase 1 (e.g. "Table: USERS")
+
+    Returns:
+        Tuple of key terms for each dependency, in order
+    """
+    return tuple(
+        tuple(term for term in dep.lower().split() if len(term) > 3)
+        for dep in dependencies
+    )
+
+
+def _count_mentioned_dependencies(dependencies: List[str], text_lower: str) -> int:
+    """
+    Count dependencies with at least one key term (> 3 chars) in the text.
+
+    Terms shared between dependencies (e.g. "table:") are searched for
+    only once.
+
+    Args:
+        dependencies: Dependency strings from Phase 1 (e.g. "Table: USERS")
+        text_lower: Lowercased text to search
+
+    Returns:
+        Number of dependencies mentioned in the text
+    """
+    term_found: Dict[str, bool] = {}
+    mentioned = 0
+    for dep_terms in _dependency_search_terms(tuple(dependencies)):
+        for term in dep_terms:
+            found = term_found.get(term)
+            if found is None:
+                found = term_found[term] = term in text_lower
+            if found:
+                mentioned += 1
+                break
+    return mentioned
 
 
 class CommentBlock(BaseModel):
@@ -20,6 +134,8 @@ class CommentBlock(BaseModel):
         comment_lines: List of comment lines (each should start with *)
         context: Brief description of what this comment explains
     """
+    model_config = ConfigDict(frozen=True)
+
     insert_before_line: int = Field(
         ...,
         description="Line number where comment should be inserted (1-indexed)",
@@ -40,14 +156,18 @@ class CommentBlock(BaseModel):
     def validate_comment_format(cls, v: List[str]) -> List[str]:
         """Ensure all comment lines start with VFP comment syntax"""
         validated = []
-        for line in v:
-            stripped = line.strip()
-            if not stripped:
-                continue  # Skip empty lines
-            # Ensure it starts with * (VFP comment syntax)
-            if not stripped.startswith('*'):
-                stripped = f"* {stripped}"
-            validated.append(stripped)
+        for entry in v:
+            # An entry may hold several physical lines; each must become a
+            # comment line, or text after a line break would be inserted
+            # into the output as code
+            for line in entry.splitlines():
+                stripped = line.strip()
+                if not stripped:
+                    continue  # Skip empty lines
+                # Ensure it starts with * (VFP comment syntax)
+                if not stripped.startswith('*'):
+                    stripped = f"* {stripped}"
+                validated.append(stripped)
         return validated
 
 
@@ -57,6 +177,8 @@ class FileHeaderComment(BaseModel):
 
     This represents the detailed header that goes at the top of the file.
     """
+    model_config = ConfigDict(frozen=True)
+
     filename: str = Field(..., description="Name of the VFP file")
     location: str = Field(..., description="Relative path from root")
     purpose: List[str] = Field(
@@ -73,10 +195,57 @@ class FileHeaderComment(BaseModel):
         description="List of main procedures/functions in file"
     )
 
+    @field_validator('filename', 'location')
+    @classmethod
+    def join_multiline_value(cls, v: str) -> str:
+        """Keep single-line header values on one physical line"""
+        lines = v.splitlines()
+        return ' '.join(line.strip() for line in lines) if len(lines) > 1 else v
+
+    @field_validator('purpose', 'dependencies', 'key_functions')
+    @classmethod
+    def split_multiline_items(cls, v: List[str]) -> List[str]:
+        """Split items containing line breaks into one item per line.
+
+        Each item is rendered behind a '*' prefix, so a line break inside
+        an item would otherwise start an uncommented line in the header.
+        """
+        if not any(len(item.splitlines()) > 1 for item in v):
+            return v
+        split_items = []
+        for item in v:
+            lines = item.splitlines()
+            if len(lines) > 1:
+                split_items.extend(line.strip() for line in lines if line.strip())
+            else:
+                split_items.append(item)
+        return split_items
+
+    # Rendered header, keyed on the field values it was built from
+    _cached_vfp: Optional[str] = PrivateAttr(default=None)
+    _cached_vfp_key: Optional[tuple] = PrivateAttr(default=None)
+
     def to_vfp_comment(self) -> str:
-        """Convert to VFP comment format with proper structure"""
+        """Convert to VFP comment format with proper structure.
+
+        The rendered text is cached and rebuilt only when a field changes.
+        """
+        key = (
+            self.filename,
+            self.location,
+            tuple(self.purpose),
+            tuple(self.dependencies),
+            tuple(self.key_functions),
+        )
+        if self._cached_vfp is None or self._cached_vfp_key != key:
+            self._cached_vfp = self._build_vfp_comment()
+            self._cached_vfp_key = key
+        return self._cached_vfp
+
+    def _build_vfp_comment(self) -> str:
+        """Render the header as a VFP comment block"""
         lines = [
-            "* " + "-" * 68,
+            HEADER_RULE,
             f"* File: {self.filename}",
             f"* Location: {self.location}",
             "*",
@@ -84,24 +253,19 @@ class FileHeaderComment(BaseModel):
         ]
 
         # Add purpose lines
-        for purpose_line in self.purpose:
-            lines.append(f"*   {purpose_line}")
+        lines.extend(["*   " + purpose_line for purpose_line in self.purpose])
 
         # Add dependencies if present
         if self.dependencies:
-            lines.append("*")
-            lines.append("* Dependencies:")
-            for dep in self.dependencies:
-                lines.append(f"*   - {dep}")
+            lines.extend(["*", "* Dependencies:"])
+            lines.extend(["*   - " + dep for dep in self.dependencies])
 
         # Add key functions if present
         if self.key_functions:
-            lines.append("*")
-            lines.append("* Key Functions:")
-            for func in self.key_functions:
-                lines.append(f"*   - {func}")
+            lines.extend(["*", "* Key Functions:"])
+            lines.extend(["*   - " + func for func in self.key_functions])
 
-        lines.append("* " + "-" * 68)
+        lines.append(HEADER_RULE)
 
         return "\n".join(lines)
 
@@ -116,6 +280,11 @@ class ChunkComments(BaseModel):
     2. Smaller output size (faster, less token usage)
     3. We manually insert comments into original code (100% preservation)
     """
+    # insert_comments_into_code() only adds comment lines (the validators
+    # split multi-line entries so every physical line is commented), so the
+    # original code needs no post-insertion preservation check
+    CODE_UNTOUCHED: ClassVar[bool] = True
+
     file_header: FileHeaderComment = Field(
         ...,
         description="Structured file header comment for this chunk"
@@ -125,6 +294,15 @@ class ChunkComments(BaseModel):
         description="List of inline comments to insert at specific positions"
     )
 
+    def get_comment_buckets(self) -> Dict[int, List[str]]:
+        """
+        Get inline comment text grouped by insertion line (see build_comment_buckets).
+
+        Returns:
+            Dictionary of insert_before_line to the joined text of each block
+        """
+        return build_comment_buckets(self.inline_comments)
+
     def insert_comments_into_code(self, original_code: str, include_header: bool = False) -> str:
         """
         Insert comments into original code WITHOUT modifying the code.
@@ -143,35 +321,9 @@ class ChunkComments(BaseModel):
             result_lines.append(self.file_header.to_vfp_comment())
             result_lines.append("")
 
-        # Split original code into lines
-        code_lines = original_code.split('\n')
-
-        # Sort inline comments by line number
-        sorted_comments = sorted(self.inline_comments, key=lambda c: c.insert_before_line)
-
-        # Track which comment we're on
-        comment_index = 0
-
-        for line_num, code_line in enumerate(code_lines, start=1):
-            # Insert any comments that belong before this line
-            while (comment_index < len(sorted_comments) and
-                   sorted_comments[comment_index].insert_before_line == line_num):
-
-                comment_block = sorted_comments[comment_index]
-
-                # Add blank line before comment for readability (unless it's the first line)
-                if line_num > 1 and result_lines and result_lines[-1].strip():
-                    result_lines.append("")
-
-                # Add comment lines
-                result_lines.extend(comment_block.comment_lines)
-
-                comment_index += 1
-
-            # Add the original code line (UNMODIFIED)
-            result_lines.append(code_line)
-
-        return '\n'.join(result_lines)
+        # Inline comments grouped by line number
+        return insert_comment_buckets(
+            result_lines, _split_code_lines(original_code), self.get_comment_buckets())
 
 
 class CommentedCode(BaseModel):
@@ -198,6 +350,19 @@ class CommentedCode(BaseModel):
         description="List of inline comments to insert at specific positions"
     )
 
+    def get_comment_buckets(self) -> Dict[int, List[str]]:
+        """
+        Get inline comment text grouped by insertion line (see build_comment_buckets).
+
+        Returns:
+            Dictionary of insert_before_line to the joined text of each block
+        """
+        return build_comment_buckets(self.inline_comments)
+
+    def _get_code_lines(self) -> Tuple[str, ...]:
+        """Get original_code_preserved split into lines (shared via _split_code_lines)."""
+        return _split_code_lines(self.original_code_preserved)
+
     def validate_code_preservation(self, original_code: str) -> bool:
         """
         Validate that the preserved code matches the original (ignoring trivial whitespace differences).
@@ -213,6 +378,13 @@ class CommentedCode(BaseModel):
         Returns:
             True if code matches semantically, False if actual code was modified
         """
+        # Fast path: preserved code is usually an exact copy (or differs only
+        # in trailing whitespace), which the normalized comparison below
+        # would accept anyway
+        preserved = self.original_code_preserved
+        if preserved == original_code or preserved.rstrip() == original_code.rstrip():
+            return True
+
         def normalize_code_line(line: str) -> str:
             """Normalize a single line for comparison"""
             # Remove leading/trailing whitespace
@@ -228,26 +400,39 @@ class CommentedCode(BaseModel):
 
             return normalized
 
-        def extract_meaningful_lines(code: str) -> list:
-            """Extract non-empty, non-comment lines"""
-            lines = []
-            for line in code.replace('\r\n', '\n').split('\n'):
-                normalized = normalize_code_line(line)
+        def iter_meaningful_lines(lines: List[str]):
+            """Yield normalized non-empty, non-comment lines"""
+            for line in lines:
+                stripped = line.strip()
                 # Skip empty lines and comment lines
-                if normalized and not line.strip().startswith('*'):
-                    lines.append(normalized)
-            return lines
-
-        # Extract and compare meaningful code lines
-        original_lines = extract_meaningful_lines(original_code)
-        preserved_lines = extract_meaningful_lines(self.original_code_preserved)
-
-        # Compare line counts
-        if len(original_lines) != len(preserved_lines):
-            return False
-
-        # Compare each line
-        for orig, pres in zip(original_lines, preserved_lines):
+                if stripped and not stripped.startswith('*'):
+                    yield normalize_code_line(line)
+
+        # Split on '\n' only: a '\r' left by CRLF endings is whitespace
+        # and removed by strip(), so no normalized copy of the code is
+        # needed (splitlines() would also split on characters such as
+        # U+0085, which latin1-decoded VFP sources can contain)
+        original_lines = _split_code_lines(original_code)
+        preserved_lines = self._get_code_lines()
+
+        # Identical leading and trailing lines normalize identically on both
+        # sides, so only the window between them needs comparing
+        limit = min(len(original_lines), len(preserved_lines))
+        prefix = 0
+        while prefix < limit and original_lines[prefix] == preserved_lines[prefix]:
+            prefix += 1
+        suffix = 0
+        while (suffix < limit - prefix
+               and original_lines[-1 - suffix] == preserved_lines[-1 - suffix]):
+            suffix += 1
+
+        # Compare meaningful code lines pairwise, stopping at the first
+        # mismatch; the sentinel catches differing line counts
+        missing = object()
+        for orig, pres in zip_longest(
+                iter_meaningful_lines(original_lines[prefix:len(original_lines) - suffix]),
+                iter_meaningful_lines(preserved_lines[prefix:len(preserved_lines) - suffix]),
+                fillvalue=missing):
             if orig != pres:
                 return False
 
@@ -261,37 +446,12 @@ class CommentedCode(BaseModel):
             Complete VFP code with comments inserted
         """
         # Start with file header
-        result_lines = [self.file_header.to_vfp_comment(), ""]
-
-        # Split original code into lines
-        code_lines = self.original_code_preserved.split('\n')
-
-        # Sort inline comments by line number
-        sorted_comments = sorted(self.inline_comments, key=lambda c: c.insert_before_line)
-
-        # Track which line we're on
-        comment_index = 0
-
-        for line_num, code_line in enumerate(code_lines, start=1):
-            # Insert any comments that belong before this line
-            while (comment_index < len(sorted_comments) and
-                   sorted_comments[comment_index].insert_before_line == line_num):
-
-                comment_block = sorted_comments[comment_index]
-
-                # Add blank line before comment for readability (unless it's line 1)
-                if line_num > 1 and code_lines[line_num - 2].strip():
-                    result_lines.append("")
-
-                # Add comment lines
-                result_lines.extend(comment_block.comment_lines)
-
-                comment_index += 1
-
-            # Add the original code line
-            result_lines.append(code_line)
-
-        return '\n'.join(result_lines)
+        return insert_comment_buckets(
+            [self.file_header.to_vfp_comment(), ""],
+            self._get_code_lines(),
+            self.get_comment_buckets(),
+            blank_after_code_line=True
+        )
 
     def assemble_inline_comments_only(self) -> str:
         """
@@ -303,37 +463,7 @@ class CommentedCode(BaseModel):
         Returns:
             VFP code with inline comments but no file header
         """
-        result_lines = []
-
-        # Split original code into lines
-        code_lines = self.original_code_preserved.split('\n')
-
-        # Sort inline comments by line number
-        sorted_comments = sorted(self.inline_comments, key=lambda c: c.insert_before_line)
-
-        # Track which line we're on
-        comment_index = 0
-
-        for line_num, code_line in enumerate(code_lines, start=1):
-            # Insert any comments that belong before this line
-            while (comment_index < len(sorted_comments) and
-                   sorted_comments[comment_index].insert_before_line == line_num):
-
-                comment_block = sorted_comments[comment_index]
-
-                # Add blank line before comment for readability (unless it's the first line)
-                if line_num > 1 and result_lines and result_lines[-1].strip():
-                    result_lines.append("")
-
-                # Add comment lines
-                result_lines.extend(comment_block.comment_lines)
-
-                comment_index += 1
-
-            # Add the original code line
-            result_lines.append(code_line)
-
-        return '\n'.join(result_lines)
+        return insert_comment_buckets([], self._get_code_lines(), self.get_comment_buckets())
 
 
 class ProcedureInfo(BaseModel):
@@ -342,6 +472,8 @@ class ProcedureInfo(BaseModel):
 
     This will be used later when we implement the full two-phase approach.
     """
+    model_config = ConfigDict(frozen=True)
+
     name: str = Field(..., description="Name of procedure or function")
     line_number: int = Field(..., description="Starting line number (1-indexed)", ge=1)
     description: str = Field(..., description="Brief description of what this procedure/function does")
@@ -405,15 +537,35 @@ class CommentQualityValidator:
         Returns:
             Comment text as string
         """
-        # Try C# method first
-        if hasattr(file_header, 'to_csharp_comment'):
-            return file_header.to_csharp_comment()
-        # Fall back to VFP method
-        elif hasattr(file_header, 'to_vfp_comment'):
-            return file_header.to_vfp_comment()
-        else:
-            # Fallback: return empty string if neither method exists
-            return ""
+        header_type = type(file_header)
+        try:
+            render = _HEADER_RENDERERS[header_type]
+        except KeyError:
+            # Resolve the render method once per header class:
+            # try C# method first, then fall back to VFP method
+            render = (getattr(header_type, 'to_csharp_comment', None)
+                      or getattr(header_type, 'to_vfp_comment', None))
+            _HEADER_RENDERERS[header_type] = render
+
+        # Fallback: return empty string if neither method exists
+        return render(file_header) if render else ""
+
+    def _get_comments_lower(self, chunk_comments) -> str:
+        """
+        Get all comment text (header and inline blocks) lowercased.
+
+        Args:
+            chunk_comments: The comments generated by LLM
+
+        Returns:
+            Lowercased comment text used for term matching
+        """
+        all_comments = self._get_header_comment_text(chunk_comments.file_header)
+        all_comments += ''.join(
+            '\n'.join(comment_block.comment_lines)
+            for comment_block in chunk_comments.inline_comments
+        )
+        return all_comments.lower()
 
     def validate_comments(
         self,
@@ -434,12 +586,15 @@ class CommentQualityValidator:
         """
         issues = []
 
+        # Comment text shared by the relevance and business term checks
+        comments_lower = self._get_comments_lower(chunk_comments)
+
         # Layer 1: Syntax validation (language-specific via handler)
         syntax_issues = self._validate_comment_syntax(chunk_comments)
         issues.extend(syntax_issues)
 
         # Layer 2: Relevance validation
-        relevance_issues = self._validate_relevance(original_code, chunk_comments)
+        relevance_issues = self._validate_relevance(original_code, chunk_comments, comments_lower)
         issues.extend(relevance_issues)
 
         # Layer 3: Completeness validation
@@ -448,7 +603,7 @@ class CommentQualityValidator:
 
         # Layer 4: Business logic validation (if context available)
         if file_context:
-            business_issues = self._validate_business_terms(chunk_comments, file_context)
+            business_issues = self._validate_business_terms(chunk_comments, file_context, comments_lower)
             issues.extend(business_issues)
 
         is_valid = len(issues) == 0
@@ -482,29 +637,31 @@ class CommentQualityValidator:
 
         return issues
 
-    def _validate_relevance(self, original_code: str, chunk_comments) -> List[str]:
+    def _validate_relevance(
+        self,
+        original_code: str,
+        chunk_comments,
+        comments_lower: Optional[str] = None
+    ) -> List[str]:
         """Validate comments reference actual code terms"""
         issues = []
 
         # Extract significant terms from code (function names, variables, keywords)
-        code_lower = original_code.lower()
         code_terms = set()
 
         # Extract keywords and identifiers (language-agnostic)
-        for line in original_code.split('\n'):
+        for line in _split_code_lines(original_code):
             stripped = line.strip()
             # Skip comment lines (works for VFP *, C# //, ///)
             if stripped and not stripped.startswith('*') and not stripped.startswith('//'):
-                # Extract potential identifiers (simplified)
-                tokens = stripped.replace('(', ' ').replace(')', ' ').replace(',', ' ').split()
-                code_terms.update(t.lower() for t in tokens if len(t) > 2)
+                # Extract potential identifiers (simplified), lowercasing
+                # the whole line once rather than each token
+                tokens = stripped.translate(_TOKEN_SEPARATORS).lower().split()
+                code_terms.update(t for t in tokens if len(t) > 2)
 
         # Get all comment text (language-aware)
-        all_comments = self._get_header_comment_text(chunk_comments.file_header)
-        for comment_block in chunk_comments.inline_comments:
-            all_comments += '\n'.join(comment_block.comment_lines)
-
-        comments_lower = all_comments.lower()
+        if comments_lower is None:
+            comments_lower = self._get_comments_lower(chunk_comments)
 
         # Count how many code terms appear in comments
         referenced_terms = sum(1 for term in code_terms if term in comments_lower)
@@ -537,26 +694,20 @@ class CommentQualityValidator:
     def _validate_business_terms(
         self,
         chunk_comments,
-        file_context
+        file_context,
+        comments_lower: Optional[str] = None
     ) -> List[str]:
         """Validate comments mention dependencies from Phase 1"""
         issues = []
 
         # Gather all comment text (language-aware)
-        all_comments = self._get_header_comment_text(chunk_comments.file_header)
-        for comment_block in chunk_comments.inline_comments:
-            all_comments += '\n'.join(comment_block.comment_lines)
-
-        comments_lower = all_comments.lower()
+        if comments_lower is None:
+            comments_lower = self._get_comments_lower(chunk_comments)
 
         # Check if dependencies are mentioned
         if hasattr(file_context, 'dependencies') and file_context.dependencies:
-            mentioned_deps = 0
-            for dep in file_context.dependencies:
-                # Extract key term from dependency (e.g., "Table: USERS" -> "users")
-                dep_terms = dep.lower().split()
-                if any(term in comments_lower for term in dep_terms if len(term) > 3):
-                    mentioned_deps += 1
+            # Key terms from each dependency (e.g., "Table: USERS" -> "users")
+            mentioned_deps = _count_mentioned_dependencies(file_context.dependencies, comments_lower)
 
             if mentioned_deps < len(file_context.dependencies) * 0.5:  # Less than 50% mentioned
                 issues.append(
@@ -604,8 +755,7 @@ class CommentInsertionValidator:
         """
         issues = []
 
-        code_lines = original_code.split('\n')
-        total_lines = len(code_lines)
+        total_lines = original_code.count('\n') + 1
 
         # Validate line numbers are within bounds
         for idx, comment_block in enumerate(chunk_comments.inline_comments):
@@ -617,17 +767,15 @@ class CommentInsertionValidator:
 
         # Check for duplicate line numbers (language-dependent)
         # Some languages (C#) allow multiple comments at same line, others (VFP) don't
-        line_numbers = [c.insert_before_line for c in chunk_comments.inline_comments]
-        if len(line_numbers) != len(set(line_numbers)):
-            # Check if language allows duplicates
-            allows_duplicates = (
-                self.handler.allows_duplicate_insertion_points()
-                if self.handler else False
-            )
-
-            if not allows_duplicates:
-                duplicates = [ln for ln in line_numbers if line_numbers.count(ln) > 1]
-                issues.append(f"Duplicate insertion points: {set(duplicates)}")
+        allows_duplicates = (
+            self.handler.allows_duplicate_insertion_points()
+            if self.handler else False
+        )
+        if not allows_duplicates:
+            line_counts = Counter(c.insert_before_line for c in chunk_comments.inline_comments)
+            duplicates = {ln for ln, count in line_counts.items() if count > 1}
+            if duplicates:
+                issues.append(f"Duplicate insertion points: {duplicates}")
 
         # NOTE: We don't fail on unsorted comments because insert_comments_into_code()
         # automatically sorts them anyway. This is just informational.
@@ -640,7 +788,8 @@ class CommentInsertionValidator:
         self,
         original_code: str,
         commented_code: str,
-        expected_comment_count: int
+        expected_comment_count: int,
+        code_untouched: bool = False
     ) -> tuple[bool, List[str]]:
         """
         Post-insertion validation.
@@ -649,52 +798,49 @@ class CommentInsertionValidator:
             original_code: The original VFP code
             commented_code: The code after comment insertion
             expected_comment_count: Number of comment blocks that should be inserted
+            code_untouched: Skip the code line comparison when the insertion
+                            is known to leave the original code as-is
 
         Returns:
             Tuple of (is_valid, list_of_issues)
         """
         issues = []
 
-        # Extract non-comment, non-blank lines from both versions
-        # (Ignore blank lines added for readability around comments)
-        original_lines = [
-            line for line in original_code.split('\n')
-            if line.strip() and not line.strip().startswith('*')
-        ]
-
-        commented_lines = [
-            line for line in commented_code.split('\n')
-            if line.strip() and not line.strip().startswith('*')
-        ]
-
-        # Validate code preservation (should have same non-blank code lines)
-        if len(original_lines) != len(commented_lines):
-            issues.append(
-                f"Code line count mismatch: original={len(original_lines)}, "
-                f"commented={len(commented_lines)}"
-            )
-        else:
-            # Check each line matches
-            mismatches = 0
-            for idx, (orig, comm) in enumerate(zip(original_lines, commented_lines), 1):
-                if orig.strip() != comm.strip():
-                    mismatches += 1
-                    if mismatches <= 3:  # Report first 3 mismatches
-                        issues.append(f"Line {idx} mismatch: '{orig[:30]}' != '{comm[:30]}'")
-
-            if mismatches > 3:
-                issues.append(f"... and {mismatches - 3} more mismatches")
+        # Code preservation check (skipped when the insertion cannot
+        # have changed the code)
+        if not code_untouched:
+            # Extract non-comment, non-blank lines from both versions
+            # (Ignore blank lines added for readability around comments)
+            original_lines = [
+                line for line in _split_code_lines(original_code)
+                if line.strip() and not line.strip().startswith('*')
+            ]
+
+            commented_lines = [
+                line for line in commented_code.split('\n')
+                if line.strip() and not line.strip().startswith('*')
+            ]
+
+            # Validate code preservation (should have same non-blank code lines)
+            if len(original_lines) != len(commented_lines):
+                issues.append(
+                    f"Code line count mismatch: original={len(original_lines)}, "
+                    f"commented={len(commented_lines)}"
+                )
+            else:
+                # Check each line matches
+                mismatches = 0
+                for idx, (orig, comm) in enumerate(zip(original_lines, commented_lines), 1):
+                    if orig.strip() != comm.strip():
+                        mismatches += 1
+                        if mismatches <= 3:  # Report first 3 mismatches
+                            issues.append(f"Line {idx} mismatch: '{orig[:30]}' != '{comm[:30]}'")
+
+                if mismatches > 3:
+                    issues.append(f"... and {mismatches - 3} more mismatches")
 
         # Count comment blocks in output
-        comment_blocks = 0
-        in_comment_block = False
-        for line in commented_code.split('\n'):
-            is_comment = line.strip().startswith('*')
-            if is_comment and not in_comment_block:
-                comment_blocks += 1
-                in_comment_block = True
-            elif not is_comment:
-                in_comment_block = False
+        comment_blocks = sum(1 for _ in _COMMENT_BLOCK_RE.finditer(commented_code))
 
         # Allow some variance (header + inline comments)
         if comment_blocks < expected_comment_count:
@@ -750,22 +896,24 @@ class CommentMetrics:
         else:
             metrics['comment_ratio'] = 0
 
-        # Keyword coverage
         if file_context:
+            # Lowercased once for both coverage checks
+            commented_lower = commented_code.lower()
+
+            # Keyword coverage
             metrics['keyword_coverage'] = self._calculate_keyword_coverage(
                 commented_code,
-                file_context
+                file_context,
+                commented_lower
             )
 
-        # Procedure/method coverage (works with both VFP procedures and C# methods)
-        if file_context:
-            # Check for either 'procedures' (VFP) or 'methods' (C#)
-            has_procs_or_methods = (hasattr(file_context, 'procedures') and file_context.procedures) or \
-                                   (hasattr(file_context, 'methods') and file_context.methods)
-            if has_procs_or_methods:
+            # Procedure/method coverage (works with both VFP procedures and C# methods)
+            _, procs = _file_context_members(file_context)
+            if procs:
                 metrics['procedure_coverage'] = self._calculate_procedure_coverage(
                     commented_code,
-                    file_context
+                    file_context,
+                    commented_lower
                 )
 
         # Average comment length
@@ -779,25 +927,19 @@ class CommentMetrics:
 
     def _count_code_lines(self, code: str) -> int:
         """Count non-comment, non-blank lines"""
-        count = 0
-        for line in code.split('\n'):
-            stripped = line.strip()
-            if stripped and not stripped.startswith('*'):
-                count += 1
-        return count
+        # First non-whitespace character of each line ('' for blank lines)
+        first_chars = [line.lstrip()[:1] for line in _split_code_lines(code)]
+        return len(first_chars) - first_chars.count('') - first_chars.count('*')
 
     def _count_comment_lines(self, code: str) -> int:
         """Count comment lines"""
-        count = 0
-        for line in code.split('\n'):
-            if line.strip().startswith('*'):
-                count += 1
-        return count
+        return len(_COMMENT_LINE_RE.findall(code))
 
     def _calculate_keyword_coverage(
         self,
         commented_code: str,
-        file_context
+        file_context,
+        commented_lower: Optional[str] = None
     ) -> float:
         """
         Calculate % of dependencies mentioned in comments.
@@ -805,26 +947,24 @@ class CommentMetrics:
         Works with both VFP (dependencies) and C# (external_dependencies) models.
         """
         # Get dependencies list - check for both VFP and C# field names
-        deps = getattr(file_context, 'dependencies', None) or getattr(file_context, 'external_dependencies', None)
+        deps, _ = _file_context_members(file_context)
 
         if not deps:
             return 100.0
 
-        comments_lower = commented_code.lower()
-        mentioned = 0
+        if commented_lower is None:
+            commented_lower = commented_code.lower()
 
-        for dep in deps:
-            # Extract key terms from dependency
-            dep_terms = dep.lower().split()
-            if any(term in comments_lower for term in dep_terms if len(term) > 3):
-                mentioned += 1
+        # Key terms from each dependency
+        mentioned = _count_mentioned_dependencies(deps, commented_lower)
 
         return (mentioned / len(deps)) * 100
 
     def _calculate_procedure_coverage(
         self,
         commented_code: str,
-        file_context
+        file_context,
+        commented_lower: Optional[str] = None
     ) -> float:
         """
         Calculate % of procedures/methods mentioned in comments.
@@ -832,12 +972,12 @@ class CommentMetrics:
         Works with both VFP (procedures) and C# (methods) models.
         """
         # Get procedures/methods list - check for both VFP and C# field names
-        procs = getattr(file_context, 'procedures', None) or getattr(file_context, 'methods', None)
+        _, procs = _file_context_members(file_context)
 
         if not procs:
             return 100.0
 
-        comments_lower = commented_code.lower()
+        comments_lower = commented_code.lower() if commented_lower is None else commented_lower
         mentioned = 0
 
         for proc in procs:
@@ -849,15 +989,13 @@ class CommentMetrics:
 
     def _calculate_avg_comment_length(self, commented_code: str) -> float:
         """Calculate average length of comment lines"""
-        comment_lines = [
-            line for line in commented_code.split('\n')
-            if line.strip().startswith('*')
-        ]
+        # One scan that only materializes the comment lines themselves
+        comment_lines = _COMMENT_TEXT_RE.findall(commented_code)
 
         if not comment_lines:
             return 0.0
 
-        total_length = sum(len(line.strip()) for line in comment_lines)
+        total_length = sum(len(line.rstrip()) for line in comment_lines)
         return total_length / len(comment_lines)
 
 
@@ -872,8 +1010,9 @@ def validate_vfp_comment_syntax(comment: str) -> bool:
     Returns:
         True if valid VFP comment syntax
     """
-    stripped = comment.strip()
-    return stripped.startswith('*') or '&&' in stripped
+    # Only leading whitespace affects the '*' check, and '&&' can be
+    # searched for in the unstripped string
+    return comment.lstrip().startswith('*') or '&&' in comment
 
 
 def extract_code_only(vfp_code: str) -> str:
@@ -886,13 +1025,11 @@ def extract_code_only(vfp_code: str) -> str:
     Returns:
         Code with comment lines removed
     """
-    lines = []
-    for line in vfp_code.split('\n'):
-        stripped = line.strip()
-        # Skip full-line comments, but keep inline comments as part of code
-        if not stripped.startswith('*'):
-            lines.append(line)
-    return '\n'.join(lines)
+    # Skip full-line comments, but keep inline comments as part of code.
+    # Each comment line is removed together with its preceding newline; the
+    # newline prepended here gives the first line one too, and is dropped
+    # again from the result
+    return _NEWLINE_COMMENT_LINE_RE.sub('', '\n' + vfp_code)[1:]
 
 
 if __name__ == "__main__":
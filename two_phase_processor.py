@@ -23,6 +23,7 @@ Supports:
 """
 
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import List, Optional, Any
 from dataclasses import dataclass
 
@@ -83,6 +84,12 @@ class TwoPhaseProcessor:
         # Use handler to create language-specific chunker
         self.chunker = handler.create_chunker(config)
 
+        # Number of Phase 2 chunk requests submitted to the LLM together.
+        # Chunks only depend on the Phase 1 context, so a server with
+        # continuous batching can co-schedule them instead of one at a time.
+        processing = (config or {}).get('processing', {})
+        self.chunk_batch_size = max(1, processing.get('chunk_batch_size', 1))
+
         # Initialize validators (pass handler for language-aware validation)
         self.quality_validator = CommentQualityValidator(handler)
         self.insertion_validator = CommentInsertionValidator(handler)
@@ -141,12 +148,9 @@ class TwoPhaseProcessor:
         self.logger.info(self.chunker.get_chunk_summary(chunks))
 
         # Comment each chunk
-        commented_chunks = []
-        for i, chunk in enumerate(chunks):
-            self.logger.info(f"Processing chunk {i+1}/{len(chunks)}: {chunk.name} ({chunk.line_count} lines)")
-
-            commented_chunk = self._comment_chunk(chunk, context, filename, relative_path)
+        commented_chunks = self._comment_chunks(chunks, context, filename, relative_path)
 
+        for i, (chunk, commented_chunk) in enumerate(zip(chunks, commented_chunks)):
             if not commented_chunk:
                 return ProcessingResult(
                     success=False,
@@ -157,9 +161,6 @@ class TwoPhaseProcessor:
                     error_message=f"Failed to comment chunk: {chunk.name}"
                 )
 
-            commented_chunks.append(commented_chunk)
-            self.logger.info(f"[OK] Chunk {i+1}/{len(chunks)} commented successfully")
-
         # Assemble final commented file
         self.logger.info("Assembling commented file...")
         final_code = self._assemble_file(context, commented_chunks, filename, relative_path)
@@ -212,6 +213,66 @@ class TwoPhaseProcessor:
             self.logger.exception(f"Context extraction failed: {e}")
             return None
 
+    def _comment_chunks(
+        self,
+        chunks: List[Any],
+        context: Any,
+        filename: str,
+        relative_path: str
+    ) -> List[Optional[str]]:
+        """
+        Phase 2: Comment all chunks, submitting up to chunk_batch_size at once.
+
+        Processing stops at the first failed chunk, since the file fails
+        anyway. In sequential mode the returned list ends with None; in
+        batched mode chunks not yet started are cancelled and, like failures,
+        appear as None in their position.
+
+        Args:
+            chunks: Code chunks to comment
+            context: File-level context from Phase 1
+            filename: Name of the file
+            relative_path: Relative path from root
+
+        Returns:
+            List of commented chunk strings (None for failed chunks)
+        """
+        total = len(chunks)
+
+        def comment_one(index: int) -> Optional[str]:
+            chunk = chunks[index]
+            self.logger.info(f"Processing chunk {index+1}/{total}: {chunk.name} ({chunk.line_count} lines)")
+
+            commented_chunk = self._comment_chunk(chunk, context, filename, relative_path)
+
+            if commented_chunk:
+                self.logger.info(f"[OK] Chunk {index+1}/{total} commented successfully")
+            return commented_chunk
+
+        if self.chunk_batch_size > 1 and total > 1:
+            self.logger.info(f"Submitting chunks in batches of {self.chunk_batch_size}")
+            commented_chunks: List[Optional[str]] = [None] * total
+            with ThreadPoolExecutor(max_workers=min(self.chunk_batch_size, total)) as executor:
+                futures = {executor.submit(comment_one, i): i for i in range(total)}
+                for future in as_completed(futures):
+                    commented_chunk = future.result()
+                    commented_chunks[futures[future]] = commented_chunk
+                    if not commented_chunk:
+                        # Chunks already in flight finish; pending ones never start
+                        for pending in futures:
+                            pending.cancel()
+                        break
+            return commented_chunks
+
+        commented_chunks = []
+        for i in range(total):
+            commented_chunk = comment_one(i)
+            commented_chunks.append(commented_chunk)
+            if not commented_chunk:
+                break
+
+        return commented_chunks
+
     def _comment_chunk(
         self,
         chunk,  # CodeChunk (type varies by language)
@@ -315,7 +376,8 @@ class TwoPhaseProcessor:
             is_valid_post, post_issues = self.insertion_validator.validate_post_insertion(
                 original_code=chunk.content,
                 commented_code=commented_code,
-                expected_comment_count=expected_comment_count
+                expected_comment_count=expected_comment_count,
+                code_untouched=getattr(comments, 'CODE_UNTOUCHED', False)
             )
 
             if not is_valid_post: